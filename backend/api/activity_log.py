@@ -0,0 +1,203 @@
+"""
+Buffered SessionActivity logging.
+
+activity_log.log() queues an event in memory and returns without touching
+the database. A daemon thread writes queued events with bulk_create, at
+most ACTIVITY_LOG_BATCH_SIZE rows per INSERT, every
+ACTIVITY_LOG_FLUSH_INTERVAL seconds or as soon as a full batch is waiting.
+Whatever is left is written at process exit.
+
+The queue is bounded (ACTIVITY_LOG_MAX_QUEUE): when it is full, new events
+are dropped and counted instead of slowing requests down. The session's
+clock fields are authoritative, so a lost event only affects the audit
+trail and ExamSession.time_from_activities().
+
+Events logged inside a transaction are queued when it commits, so rolled
+back requests leave no trace. With ACTIVITY_LOG_BUFFERED off, events are
+written immediately, in the caller's transaction (one bulk_create per log()
+or log_many() call).
+"""
+
+import atexit
+import collections
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from api.models import ExamSession, SessionActivity
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLog:
+    """Per-process, bounded queue of SessionActivity rows"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = collections.deque()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.logged = 0  # Events accepted into the queue
+        self.written = 0  # Rows inserted
+        self.dropped = 0  # Events rejected because the queue was full
+        self.failed = 0  # Events lost to database errors
+        self._reported_losses = 0
+
+    @property
+    def buffered(self):
+        return getattr(settings, "ACTIVITY_LOG_BUFFERED", True)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 500)
+
+    @property
+    def max_queue(self):
+        return getattr(settings, "ACTIVITY_LOG_MAX_QUEUE", 10000)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 2)
+
+    def log(self, session_id, activity_type, timestamp=None, metadata=None):
+        """
+        Record an activity for a session (ExamSession pk); returns immediately
+        The timestamp defaults to now, i.e. when the event happened rather
+        than when it is written
+        """
+        self.log_many(session_id, [(activity_type, metadata)], timestamp=timestamp)
+
+    def log_many(self, session_id, events, timestamp=None):
+        """
+        Record several (activity_type, metadata) events of one session at
+        once; unbuffered, they are written with a single bulk INSERT
+        """
+        timestamp = timestamp or timezone.now()
+        activities = [
+            SessionActivity(
+                session_id=session_id,
+                activity_type=activity_type,
+                timestamp=timestamp,
+                metadata=metadata,
+            )
+            for activity_type, metadata in events
+        ]
+        if not activities:
+            return
+        if not self.buffered:
+            SessionActivity.objects.bulk_create(activities)
+            return
+        transaction.on_commit(lambda: self._enqueue(activities))
+
+    def _enqueue(self, activities):
+        with self._lock:
+            accepted = activities[: max(0, self.max_queue - len(self._queue))]
+            self.dropped += len(activities) - len(accepted)
+            if not accepted:
+                return
+            self._queue.extend(accepted)
+            self.logged += len(accepted)
+            full = len(self._queue) >= self.batch_size
+
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def stats(self):
+        """Counters since process start, plus the current queue length"""
+        with self._lock:
+            return {
+                "pending": len(self._queue),
+                "logged": self.logged,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def flush(self):
+        """Write everything queued so far, one bulk INSERT per batch"""
+        while True:
+            with self._lock:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+            if not batch:
+                break
+
+            try:
+                written = self._write(batch)
+            except Exception:
+                logger.exception("Activity log flush failed for %d events", len(batch))
+                written = 0
+
+            with self._lock:
+                self.written += written
+                self.failed += len(batch) - written
+
+        self._report_losses()
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                SessionActivity.objects.bulk_create(batch)
+            return len(batch)
+        except IntegrityError:
+            # A session was deleted after its event was queued
+            live = {
+                str(session_id)
+                for session_id in ExamSession.objects.filter(
+                    session_id__in={a.session_id for a in batch}
+                ).values_list("session_id", flat=True)
+            }
+            batch = [a for a in batch if str(a.session_id) in live]
+            SessionActivity.objects.bulk_create(batch)
+            return len(batch)
+
+    def _report_losses(self):
+        with self._lock:
+            lost = self.dropped + self.failed
+            new, self._reported_losses = lost - self._reported_losses, lost
+        if new:
+            logger.warning(
+                "Activity log lost %d events (%d dropped on a full queue, "
+                "%d failed to write in total)",
+                new,
+                self.dropped,
+                self.failed,
+            )
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-log-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Activity log flusher error")
+            finally:
+                close_old_connections()
+
+
+activity_log = ActivityLog()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        activity_log.flush()
+    except Exception:
+        pass
@@ -86,6 +86,7 @@ class ExamSessionAdmin(admin.ModelAdmin):
         "started_at",
         "completed_at",
         "correct_answers",
+        "activity_time_display",
     ]
     ordering = ["-started_at"]
 
@@ -99,6 +100,8 @@ class ExamSessionAdmin(admin.ModelAdmin):
                     "paused_at",
                     "completed_at",
                     "total_time_spent",
+                    "running_since",
+                    "activity_time_display",
                     "exam_duration",
                 )
             },
@@ -108,13 +111,19 @@ class ExamSessionAdmin(admin.ModelAdmin):
     )
 
     def time_spent_display(self, obj):
-        hours = obj.total_time_spent // 3600
-        minutes = (obj.total_time_spent % 3600) // 60
-        seconds = obj.total_time_spent % 60
+        elapsed = obj.elapsed_time()
+        hours = elapsed // 3600
+        minutes = (elapsed % 3600) // 60
+        seconds = elapsed % 60
         return f"{hours}h {minutes}m {seconds}s"
 
     time_spent_display.short_description = "Time Spent"
 
+    def activity_time_display(self, obj):
+        return f"{obj.time_from_activities()}s"
+
+    activity_time_display.short_description = "Time Spent (activity log)"
+
 
 class ExamQuestionInline(admin.TabularInline):
     """Inline display of questions in ExamSession"""
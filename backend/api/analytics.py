@@ -1,14 +1,41 @@
-from django.db.models import Count, Q, Avg, Sum
+from api.question_bank import question_bank
 
 
 class ExamAnalyticsBuilder:
-    """Modern analytics report builder for exam sessions"""
+    """
+    Modern analytics report builder for exam sessions
+
+    Reads the session's exam questions once (a single values_list query,
+    question content joined from the in-memory question bank) and derives
+    every report section from that pass.
+    """
+
+    ROW_FIELDS = (
+        "user_answer",
+        "is_correct",
+        "time_spent",
+        "marked_for_review",
+        "answered_at",
+        "question__category__name",
+        "question__question_text",
+        "question__choice_a",
+        "question__choice_b",
+        "question__choice_c",
+        "question__choice_d",
+        "question__correct_answer",
+        "question__explanation",
+    )
 
     def __init__(self, session):
         self.session = session
-        self.exam_qs = session.exam_questions.select_related(
-            "question", "question__category"
-        )
+        self._stats = None
+
+    @property
+    def stats(self):
+        """Aggregates collected from one pass over the exam questions"""
+        if self._stats is None:
+            self._stats = self._collect()
+        return self._stats
 
     def build_report(self, submission_type):
         """Build comprehensive analytics report"""
@@ -22,6 +49,80 @@ class ExamAnalyticsBuilder:
             "insights": self._generate_insights(),
         }
 
+    def _collect(self):
+        """Single loop over (question_number-ordered) exam question tuples"""
+        rows = question_bank.values_list(
+            self.session.exam_questions.order_by("question_number"), *self.ROW_FIELDS
+        )
+
+        total = answered = correct = marked = 0
+        categories = {}
+        questions = []
+
+        for number, (
+            user_answer,
+            is_correct,
+            time_spent,
+            marked_for_review,
+            answered_at,
+            category,
+            question_text,
+            choice_a,
+            choice_b,
+            choice_c,
+            choice_d,
+            correct_answer,
+            explanation,
+        ) in enumerate(rows, 1):
+            is_answered = answered_at is not None
+
+            total += 1
+            answered += is_answered
+            correct += is_correct is True
+            marked += marked_for_review
+
+            cat = categories.setdefault(
+                category, {"total": 0, "correct": 0, "skipped": 0, "total_time": 0}
+            )
+            cat["total"] += 1
+            cat["correct"] += is_correct is True
+            cat["skipped"] += not is_answered
+            cat["total_time"] += time_spent
+
+            questions.append(
+                {
+                    "number": number,
+                    "category": category,
+                    "question": question_text,
+                    "choices": {
+                        "a": choice_a,
+                        "b": choice_b,
+                        "c": choice_c,
+                        "d": choice_d,
+                    },
+                    "user_answer": user_answer,
+                    "correct_answer": correct_answer,
+                    "is_correct": is_correct,
+                    "explanation": explanation,
+                    "time_spent": time_spent,
+                    "marked": marked_for_review,
+                    "status": (
+                        "correct"
+                        if is_correct
+                        else ("incorrect" if user_answer else "skipped")
+                    ),
+                }
+            )
+
+        return {
+            "total": total,
+            "answered": answered,
+            "correct": correct,
+            "marked": marked,
+            "categories": categories,
+            "questions": questions,
+        }
+
     def _submission_info(self, submission_type):
         """Submission metadata"""
         return {
@@ -46,9 +147,8 @@ class ExamAnalyticsBuilder:
 
     def _answer_breakdown(self):
         """Question answer statistics"""
-        total = self.exam_qs.count()
-        answered = self.exam_qs.filter(answered_at__isnull=False).count()
-        correct = self.exam_qs.filter(is_correct=True).count()
+        stats = self.stats
+        total, answered, correct = stats["total"], stats["answered"], stats["correct"]
 
         return {
             "total": total,
@@ -56,100 +156,59 @@ class ExamAnalyticsBuilder:
             "skipped": total - answered,
             "correct": correct,
             "incorrect": answered - correct,
-            "marked_for_review": self.exam_qs.filter(marked_for_review=True).count(),
+            "marked_for_review": stats["marked"],
         }
 
     def _timing_analysis(self):
         """Time statistics"""
-        answered = self.exam_qs.filter(answered_at__isnull=False).count()
+        answered = self.stats["answered"]
+        per_answered = (
+            round(self.session.total_time_spent / answered, 1) if answered > 0 else 0
+        )
 
         return {
             "total_seconds": self.session.total_time_spent,
             "formatted": self._format_time(self.session.total_time_spent),
-            "average_per_question": round(self.session.average_time_per_question, 1),
-            "average_per_answered": (
-                round(self.session.total_time_spent / answered, 1)
-                if answered > 0
-                else 0
-            ),
+            "average_per_question": round(per_answered, 1),
+            "average_per_answered": per_answered,
         }
 
     def _category_report(self):
         """Category-wise performance breakdown"""
-        cats = (
-            self.exam_qs.values("question__category__name")
-            .annotate(
-                total=Count("id"),
-                correct=Count("id", filter=Q(is_correct=True)),
-                skipped=Count("id", filter=Q(answered_at__isnull=True)),
-                avg_time=Avg("time_spent"),
-                total_time=Sum("time_spent"),
-            )
-            .order_by("correct")
+        cats = sorted(
+            self.stats["categories"].items(),
+            key=lambda item: (item[1]["correct"], item[0]),
         )  # Weakest first
 
         return [
             {
-                "name": cat["question__category__name"],
+                "name": name,
                 "questions": cat["total"],
                 "correct": cat["correct"],
                 "incorrect": cat["total"] - cat["correct"] - cat["skipped"],
                 "skipped": cat["skipped"],
                 "accuracy": round((cat["correct"] / cat["total"]) * 100, 1),
-                "avg_time_per_question": round(cat["avg_time"] or 0, 1),
-                "total_time": cat["total_time"] or 0,
+                "avg_time_per_question": round(cat["total_time"] / cat["total"], 1),
+                "total_time": cat["total_time"],
             }
-            for cat in cats
+            for name, cat in cats
         ]
 
     def _questions_report(self):
         """Detailed question-by-question review"""
-        questions = []
-
-        for idx, eq in enumerate(self.exam_qs.select_related("question"), 1):
-            q = eq.question
-            questions.append(
-                {
-                    "number": idx,
-                    "category": q.category.name,
-                    "question": q.question_text,
-                    "choices": {
-                        "a": q.choice_a,
-                        "b": q.choice_b,
-                        "c": q.choice_c,
-                        "d": q.choice_d,
-                    },
-                    "user_answer": eq.user_answer,
-                    "correct_answer": q.correct_answer,
-                    "is_correct": eq.is_correct,
-                    "explanation": q.explanation,
-                    "time_spent": eq.time_spent,
-                    "marked": eq.marked_for_review,
-                    "status": (
-                        "correct"
-                        if eq.is_correct
-                        else ("incorrect" if eq.user_answer else "skipped")
-                    ),
-                }
-            )
-
-        return questions
+        return self.stats["questions"]
 
     def _generate_insights(self):
         """Generate actionable insights and recommendations"""
         insights = []
-        total = self.exam_qs.count()
+        stats = self.stats
+        total = stats["total"]
 
         # ✅ Category weakness
-        cats = self.exam_qs.values("question__category__name").annotate(
-            correct=Count("id", filter=Q(is_correct=True)),
-            total=Count("id"),
-        )
-
         weak_cats = [
-            c["question__category__name"]
-            for c in cats
-            if (c["correct"] / c["total"] * 100) < 65
+            name
+            for name, cat in sorted(stats["categories"].items())
+            if (cat["correct"] / cat["total"] * 100) < 65
         ]
 
         if weak_cats:
@@ -162,7 +221,7 @@ class ExamAnalyticsBuilder:
             )
 
         # ✅ Skipped questions
-        skipped = self.exam_qs.filter(answered_at__isnull=True).count()
+        skipped = total - stats["answered"]
         if skipped > total * 0.1:
             insights.append(
                 {
@@ -183,7 +242,7 @@ class ExamAnalyticsBuilder:
             )
 
         # ✅ Low confidence (marked for review)
-        marked = self.exam_qs.filter(marked_for_review=True).count()
+        marked = stats["marked"]
         if marked > total * 0.2:
             insights.append(
                 {
@@ -0,0 +1,239 @@
+"""
+Write-behind buffer for autosave payloads.
+
+When AUTOSAVE_BUFFER_ENABLED is set, the autosave endpoint hands payloads to
+this buffer and answers immediately. Successive payloads are merged per
+session in memory (newest seq wins per ExamQuestion field) and written in
+batched transactions by a daemon thread every AUTOSAVE_FLUSH_INTERVAL
+seconds, when a session is submitted or resumed, and at process exit.
+
+Pending state lives in the worker process that received it, so only enable
+the buffer with a single worker or session-sticky routing.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from api.helpers import save_answers, save_progress
+from api.models import ExamSession
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FIELDS = ("current_question_number",)  # Time is kept server-side
+
+
+class PendingSave:
+    """
+    Merged autosave state for one session
+
+    Every field is held with the seq it was sent with, and the newest seq
+    wins per field (delta versions are per field too, see
+    DELTA_VERSION_FIELDS), so merging never stamps a value with another
+    field's seq
+    """
+
+    def __init__(self):
+        self.seq = None  # Highest seq merged
+        self.progress = {}  # field -> (seq, value)
+        self.answers = {}  # exam question id -> {field: (seq, value)}
+
+    def merge(self, data, seq=None):
+        """Fold a payload sent with seq into this one"""
+        if seq is not None:
+            self.seq = seq if self.seq is None else max(self.seq, seq)
+
+        for field in PROGRESS_FIELDS:
+            if field in data:
+                self._put(self.progress, field, data[field], seq)
+
+        for answer in data.get("answers", []):
+            try:
+                question_id = int(answer["question_id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            fields = self.answers.setdefault(question_id, {})
+            for field, value in answer.items():
+                if field != "question_id":
+                    self._put(fields, field, value, seq)
+
+    def merge_pending(self, other):
+        """Fold in another PendingSave, keeping each field's own seq"""
+        if other.seq is not None:
+            self.seq = other.seq if self.seq is None else max(self.seq, other.seq)
+
+        for field, (seq, value) in other.progress.items():
+            self._put(self.progress, field, value, seq)
+        for question_id, fields in other.answers.items():
+            merged = self.answers.setdefault(question_id, {})
+            for field, (seq, value) in fields.items():
+                self._put(merged, field, value, seq)
+
+    @staticmethod
+    def _put(held, field, value, seq):
+        current = held.get(field)
+        if current is None or seq is None or current[0] is None or seq >= current[0]:
+            held[field] = (seq, value)
+
+    def progress_payload(self):
+        """(progress fields, seq to save them with)"""
+        seqs = [seq for seq, _ in self.progress.values() if seq is not None]
+        data = {field: value for field, (_, value) in self.progress.items()}
+        return data, max(seqs) if seqs else self.seq
+
+    def answer_batches(self):
+        """[(seq, answers)]: every field grouped under its own seq, oldest first"""
+        groups = {}
+        for question_id, fields in self.answers.items():
+            for field, (seq, value) in fields.items():
+                answers = groups.setdefault(seq, {})
+                answers.setdefault(question_id, {"question_id": question_id})
+                answers[question_id][field] = value
+
+        order = sorted(groups, key=lambda seq: (seq is not None, seq or 0))
+        return [(seq, list(groups[seq].values())) for seq in order]
+
+
+class AutosaveBuffer:
+    """Per-process, per-session write-behind buffer"""
+
+    BATCH_SIZE = 50  # Sessions written per transaction
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # session_id (str) -> PendingSave
+        self._writing = {}  # session_id (str) -> Event set once its write ends
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, "AUTOSAVE_BUFFER_ENABLED", False)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "AUTOSAVE_FLUSH_INTERVAL", 5)
+
+    def add(self, session_id, data, seq=None):
+        """Queue an autosave payload; returns immediately"""
+        with self._lock:
+            pending = self._pending.setdefault(str(session_id), PendingSave())
+            pending.merge(data, seq=seq)
+        self._ensure_worker()
+
+    def flush(self, session_id=None):
+        """
+        Write pending state to the database
+        Flushes a single session when session_id is given, otherwise everything.
+        A single-session flush also waits for a write of that session already
+        under way in another thread, so on return its saves are committed
+        """
+        if session_id is not None:
+            self._flush_session(str(session_id))
+            return
+
+        with self._lock:
+            # Sessions being written elsewhere stay queued for the next round
+            items = [
+                (session_id, entry)
+                for session_id, entry in self._pending.items()
+                if session_id not in self._writing
+            ]
+            for session_id, _ in items:
+                del self._pending[session_id]
+                self._writing[session_id] = threading.Event()
+
+        self._write_batches(items)
+
+    def _flush_session(self, session_id):
+        while True:
+            with self._lock:
+                writing = self._writing.get(session_id)
+                if writing is None:
+                    entry = self._pending.pop(session_id, None)
+                    if entry is None:
+                        return
+                    self._writing[session_id] = threading.Event()
+                    break
+            # Wait for it, then pick up anything queued (or requeued) since
+            writing.wait()
+
+        self._write_batches([(session_id, entry)])
+
+    def _write_batches(self, items):
+        """Write claimed entries; on failure requeue every unwritten one"""
+        for start in range(0, len(items), self.BATCH_SIZE):
+            batch = dict(items[start : start + self.BATCH_SIZE])
+            try:
+                self._write(batch)
+            except BaseException:
+                unwritten = dict(items[start:])
+                logger.exception(
+                    "Autosave flush failed, requeued %d sessions", len(unwritten)
+                )
+                self._requeue(unwritten)
+                raise
+            self._release(batch)
+
+    def _write(self, batch):
+        with transaction.atomic():
+            sessions = ExamSession.objects.filter(
+                session_id__in=batch, status__in=["in_progress", "paused"]
+            )
+            for session in sessions:
+                entry = batch[str(session.session_id)]
+                progress, seq = entry.progress_payload()
+                save_progress(session, progress, seq=seq)
+                for seq, answers in entry.answer_batches():
+                    save_answers(session, answers, seq=seq)
+
+    def _requeue(self, batch):
+        """Put failed entries back underneath anything queued since"""
+        with self._lock:
+            for session_id, entry in batch.items():
+                newer = self._pending.get(session_id)
+                if newer is not None:
+                    entry.merge_pending(newer)
+                self._pending[session_id] = entry
+        self._release(batch)
+
+    def _release(self, session_ids):
+        with self._lock:
+            events = [self._writing.pop(session_id) for session_id in session_ids]
+        for event in events:
+            event.set()
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="autosave-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass  # Already logged; entries were requeued
+            finally:
+                close_old_connections()
+
+
+autosave_buffer = AutosaveBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        autosave_buffer.flush()
+    except Exception:
+        pass
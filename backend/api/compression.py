@@ -0,0 +1,112 @@
+"""
+Response compression.
+
+CompressionMiddleware negotiates brotli (when the optional brotli package is
+installed) or gzip for every response. Immutable bodies - result snapshots
+and exam papers - are compressed once with encode_body() and served as-is by
+precompressed_response(), which the middleware then leaves alone.
+"""
+
+import gzip
+
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Server preference, best first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+BROTLI_QUALITY = 5  # On-the-fly; stored bodies use the maximum
+MIN_LENGTH = 200  # Same cut-off as GZipMiddleware
+
+
+def negotiate_encoding(request, available=ENCODINGS):
+    """First of `available` that the request's Accept-Encoding allows, or None"""
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+
+    for coding in available:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def encode_body(body):
+    """
+    Compress an immutable body with every supported encoding
+    Returns: {"gzip": bytes, "br": bytes} ("br" only with brotli installed)
+    """
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=11)
+    return encoded
+
+
+def precompressed_response(request, encoded, content_type, headers=None):
+    """
+    HttpResponse carrying a stored compressed body, or None when the client
+    accepts none of the stored encodings
+    """
+    available = [coding for coding in ENCODINGS if encoded.get(coding)]
+    coding = negotiate_encoding(request, available)
+    if coding is None:
+        return None
+
+    response = HttpResponse(encoded[coding], content_type=content_type)
+    for header, value in (headers or {}).items():
+        response.headers[header] = value
+
+    # Same ETag handling as GZipMiddleware (RFC 9110 Section 8.8.1)
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = "W/" + etag
+    response.headers["Content-Encoding"] = coding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers brotli when the client accepts it"""
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or len(response.content) < MIN_LENGTH
+            or response.has_header("Content-Encoding")
+            or negotiate_encoding(request) != "br"
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
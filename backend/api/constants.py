@@ -10,3 +10,7 @@ class EPPPConfig:
     # Score scale
     MIN_SCALED_SCORE = 200
     MAX_SCALED_SCORE = 800
+
+    # Unfinished sessions with no activity for this long are abandoned
+    # (see the sweep_sessions management command)
+    SESSION_IDLE_DAYS = 7
@@ -0,0 +1,202 @@
+"""
+Import questions from the preprocessing script's merged JSON.
+
+Reads the file incrementally (a JSON array or JSON Lines), validates each
+record, drops duplicates by content hash in memory and inserts the rest in
+chunks with bulk_create(ignore_conflicts=True), one transaction per chunk,
+so it works on any configured database.
+Invalid records (e.g. still uncategorized) are counted and skipped; run
+with -v 2 to list them. Running servers start sampling the new questions
+within QUESTION_BANK_VERSION_TTL seconds (the bank version is bumped in
+the database), without a restart.
+
+    python manage.py import_questions scripts/output/Exam_1_Final.json
+    python manage.py import_questions bank.jsonl --chunk-size 5000
+"""
+
+import json
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Category, Question
+from api.question_bank import bump_bank_version
+
+TEXT_FIELDS = ("question_text", "choice_a", "choice_b", "choice_c", "choice_d")
+ANSWERS = ("a", "b", "c", "d")
+READ_SIZE = 1 << 20  # Characters read per refill
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_records(path):
+    """
+    Yield the objects of a top-level JSON array or a JSON Lines file
+    without loading the whole file
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, encoding="utf-8") as f:
+        buffer, pos, eof = f.read(READ_SIZE), 0, False
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if buffer.startswith("[", pos):
+            pos += 1
+
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos == len(buffer) or buffer.startswith("]", pos):
+                if eof:
+                    return
+                if pos < len(buffer):
+                    return  # End of the array
+            else:
+                try:
+                    record, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise CommandError(f"Invalid JSON in {path}: {e}") from e
+                else:
+                    yield record
+                    continue
+
+            # Record spans the end of the buffer (or buffer drained): refill
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+
+class Command(BaseCommand):
+    help = "Bulk import questions from the preprocessing script's merged JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Merged JSON array or JSON Lines file")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Questions per bulk insert / transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and count without writing",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        # Records carry the category number (pk); names are accepted too
+        categories = dict(Category.objects.values_list("name", "id"))
+        category_ids = set(categories.values())
+
+        started = time.perf_counter()
+        before = Question.objects.count()
+
+        # Duplicates (of the bank or earlier records) are dropped by hash here,
+        # so chunks only carry new questions
+        known = set(
+            Question.objects.exclude(content_hash=None).values_list(
+                "content_hash", flat=True
+            )
+        )
+        queued = duplicates = invalid = 0
+        chunk = []
+
+        try:
+            records = iter_records(options["path"])
+            for number, record in enumerate(records, 1):
+                question, error = self._build(record, categories, category_ids)
+                if error:
+                    invalid += 1
+                    if options["verbosity"] >= 2:
+                        label = (
+                            record.get("number", number)
+                            if isinstance(record, dict)
+                            else number
+                        )
+                        self.stderr.write(f"Skipping question {label}: {error}")
+                    continue
+
+                if question.content_hash in known:
+                    duplicates += 1
+                    continue
+                known.add(question.content_hash)
+
+                queued += 1
+                chunk.append(question)
+                if len(chunk) >= chunk_size:
+                    self._insert(chunk, options["dry_run"])
+                    chunk = []
+
+            self._insert(chunk, options["dry_run"])
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}") from e
+        finally:
+            inserted = Question.objects.count() - before
+            if inserted:
+                # bulk_create skips the post_save signal; the version is read
+                # from the database, so running servers see this bump too
+                bump_bank_version()
+
+        if not options["dry_run"]:
+            duplicates += queued - inserted  # Inserted concurrently
+        else:
+            inserted = queued
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Validated' if options['dry_run'] else 'Imported'} "
+                f"{queued + duplicates + invalid} records in {elapsed:.1f}s: "
+                f"{inserted} {'new' if options['dry_run'] else 'inserted'}, "
+                f"{duplicates} duplicates, {invalid} invalid"
+            )
+        )
+
+    @staticmethod
+    def _build(record, categories, category_ids):
+        """(Question, None) for a valid record, else (None, reason)"""
+        if not isinstance(record, dict):
+            return None, "not a JSON object"
+
+        values = {}
+        for field in TEXT_FIELDS:
+            value = record.get(field)
+            value = value.strip() if isinstance(value, str) else ""
+            if not value:
+                return None, f"missing {field}"
+            if field != "question_text" and len(value) > 500:
+                return None, f"{field} is longer than 500 characters"
+            values[field] = value
+
+        correct_answer = str(record.get("correct_answer", "")).strip().lower()
+        if correct_answer not in ANSWERS:
+            return None, f"invalid correct_answer {record.get('correct_answer')!r}"
+
+        category_id = category = record.get("category")
+        if isinstance(category, str):
+            category_id = categories.get(
+                category, int(category) if category.isdigit() else None
+            )
+        if type(category_id) is not int or category_id not in category_ids:
+            return None, f"unknown category {category!r}"
+
+        question = Question(
+            category_id=category_id,
+            correct_answer=correct_answer,
+            explanation=record.get("explanation") or "",
+            is_active=record.get("is_active", True) is not False,
+            **values,
+        )
+        question.content_hash = question.compute_content_hash()
+        return question, None
+
+    @staticmethod
+    def _insert(chunk, dry_run):
+        if not chunk or dry_run:
+            return
+        with transaction.atomic():
+            Question.objects.bulk_create(chunk, ignore_conflicts=True)
@@ -0,0 +1,68 @@
+"""
+Expire timed-out exam sessions and abandon idle ones.
+
+Run it from cron, or keep it running as a worker with --loop:
+    python manage.py sweep_sessions
+    python manage.py sweep_sessions --loop 300
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from api.constants import EPPPConfig
+from api.helpers import sweep_sessions
+
+
+class Command(BaseCommand):
+    help = "Expire (and score) timed-out sessions and abandon idle ones in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--idle-days",
+            type=float,
+            default=EPPPConfig.SESSION_IDLE_DAYS,
+            help="Abandon active sessions with no activity for this many days",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=5000,
+            help="Maximum sessions expired and abandoned per run (each)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Sessions per bulk update",
+        )
+        parser.add_argument(
+            "--loop",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running, sweeping every SECONDS (default: run once)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            idle_before = timezone.now() - timedelta(days=options["idle_days"])
+            result = sweep_sessions(
+                idle_before,
+                limit=options["limit"],
+                chunk_size=options["chunk_size"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Expired {result['expired']} sessions, "
+                    f"abandoned {result['abandoned']}"
+                )
+            )
+
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["loop"])
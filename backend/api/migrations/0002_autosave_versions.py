@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="examquestion",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="examsession",
+            name="autosave_seq",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
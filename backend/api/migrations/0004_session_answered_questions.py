@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_answered_questions(apps, schema_editor):
+    """Denormalize the answered count for sessions completed before this field"""
+    ExamSession = apps.get_model("api", "ExamSession")
+    ExamQuestion = apps.get_model("api", "ExamQuestion")
+
+    answered = (
+        ExamQuestion.objects.filter(session=OuterRef("pk"), answered_at__isnull=False)
+        .order_by()
+        .values("session")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    ExamSession.objects.filter(status="completed").update(
+        answered_questions=Coalesce(Subquery(answered), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_result_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="examsession",
+            name="answered_questions",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_answered_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_session_answered_questions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                fields=["status", "completed_at", "session_id"],
+                name="session_status_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                fields=["status", "scaled_score", "session_id"],
+                name="session_status_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                fields=["status", "total_time_spent", "session_id"],
+                name="session_status_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                fields=["status", "correct_answers", "session_id"],
+                name="session_status_accuracy_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:58
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def seed_results_summary(apps, schema_editor):
+    """Start the running totals from the sessions completed so far"""
+    ExamSession = apps.get_model("api", "ExamSession")
+    ResultsSummary = apps.get_model("api", "ResultsSummary")
+
+    stats = ExamSession.objects.filter(
+        status="completed", completed_at__isnull=False
+    ).aggregate(
+        total_exams=Count("session_id"),
+        passed=Count("session_id", filter=Q(scaled_score__gte=F("passing_score"))),
+        failed=Count("session_id", filter=Q(scaled_score__lt=F("passing_score"))),
+    )
+    ResultsSummary.objects.update_or_create(pk=1, defaults=stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_results_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResultsSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_exams", models.IntegerField(default=0)),
+                ("passed", models.IntegerField(default=0)),
+                ("failed", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Results Summary",
+            },
+        ),
+        migrations.RunPython(seed_results_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_results_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resultsnapshot",
+            name="body_br",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name="resultsnapshot",
+            name="body_gzip",
+            field=models.BinaryField(null=True),
+        ),
+    ]
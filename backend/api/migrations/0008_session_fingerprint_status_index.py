@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_result_snapshot_compressed_bodies"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                condition=models.Q(("browser_fingerprint__isnull", False)),
+                fields=["browser_fingerprint", "status", "started_at"],
+                name="session_fingerprint_status_idx",
+            ),
+        ),
+    ]
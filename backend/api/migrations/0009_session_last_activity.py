@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_last_activity(apps, schema_editor):
+    """
+    Estimate the last activity of unfinished sessions (start, pause or latest
+    answer) so the sweeper doesn't treat them all as active right now
+    """
+    ExamSession = apps.get_model("api", "ExamSession")
+    ExamQuestion = apps.get_model("api", "ExamQuestion")
+
+    last_answer = (
+        ExamQuestion.objects.filter(session=OuterRef("pk"))
+        .order_by()
+        .values("session")
+        .annotate(latest=Max("answered_at"))
+        .values("latest")
+    )
+    ExamSession.objects.filter(status__in=["in_progress", "paused"]).update(
+        last_activity_at=Greatest(
+            F("started_at"),
+            Coalesce(F("paused_at"), F("started_at")),
+            Coalesce(Subquery(last_answer), F("started_at")),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_session_fingerprint_status_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="examsession",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="examsession",
+            index=models.Index(
+                fields=["status", "last_activity_at"],
+                name="session_status_activity_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+    ]
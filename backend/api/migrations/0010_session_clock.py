@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:13
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_running_clocks(apps, schema_editor):
+    """
+    In-progress sessions carry the client-reported time as of their last
+    autosave; run their clock from there (resume drops any idle gap)
+    """
+    ExamSession = apps.get_model("api", "ExamSession")
+    ExamSession.objects.filter(status="in_progress").update(
+        running_since=F("last_activity_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_session_last_activity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="examsession",
+            name="running_since",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="sessionactivity",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(start_running_clocks, migrations.RunPython.noop),
+    ]
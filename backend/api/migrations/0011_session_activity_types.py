@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_session_clock"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="sessionactivity",
+            name="activity_type",
+            field=models.CharField(
+                choices=[
+                    ("start", "Started"),
+                    ("pause", "Paused"),
+                    ("resume", "Resumed"),
+                    ("submit", "Submitted"),
+                    ("category_change", "Category Changed"),
+                    ("question_view", "Question Viewed"),
+                    ("answer_change", "Answer Changed"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
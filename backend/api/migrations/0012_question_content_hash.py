@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:22
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+def question_content_hash(question_text, choice_a, choice_b, choice_c, choice_d):
+    """Frozen copy of api.models.question_content_hash as of this migration"""
+    parts = (question_text, choice_a, choice_b, choice_c, choice_d)
+    normalized = "\x1f".join(
+        " ".join(unicodedata.normalize("NFKC", part or "").split()).casefold()
+        for part in parts
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+def backfill_content_hash(apps, schema_editor):
+    """
+    Hash existing questions. Rows whose normalized content repeats an
+    earlier question (differing only in case or whitespace) keep a NULL
+    hash: they stay usable and editable, but saving new text or choices
+    for one reports it as a duplicate.
+    """
+    Question = apps.get_model("api", "Question")
+
+    seen = set()
+    batch = []
+    rows = Question.objects.order_by("id").values_list(
+        "id", "question_text", "choice_a", "choice_b", "choice_c", "choice_d"
+    )
+    for question_id, *content in rows.iterator(chunk_size=2000):
+        content_hash = question_content_hash(*content)
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        batch.append(Question(id=question_id, content_hash=content_hash))
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    Question.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_session_activity_types"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="content_hash",
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="question",
+            name="unique_complete_question",
+        ),
+        migrations.AddConstraint(
+            model_name="question",
+            constraint=models.UniqueConstraint(
+                fields=("content_hash",),
+                name="unique_question_content_hash",
+                violation_error_message="A question and answers with this text already exists.",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:48
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_row_version(apps, schema_editor):
+    """
+    Every field starts at the row's old version: a delta older than that
+    could have been superseded, so it stays rejected
+    """
+    ExamQuestion = apps.get_model("api", "ExamQuestion")
+    ExamQuestion.objects.exclude(answer_version=0).update(
+        review_version=F("answer_version"), time_version=F("answer_version")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_question_bank_version"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="examquestion",
+            old_name="version",
+            new_name="answer_version",
+        ),
+        migrations.AddField(
+            model_name="examquestion",
+            name="review_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="examquestion",
+            name="time_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(copy_row_version, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
 from django.db import models
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import unicodedata
 import uuid
 
 from api.constants import EPPPConfig
@@ -21,6 +26,23 @@ class Category(models.Model):
         return self.name
 
 
+def question_content_hash(question_text, choice_a, choice_b, choice_c, choice_d):
+    """
+    Hash of a question's normalized text and choices (Unicode NFKC,
+    whitespace collapsed, case folded), used to detect duplicates
+    """
+    parts = (question_text, choice_a, choice_b, choice_c, choice_d)
+    normalized = "\x1f".join(
+        " ".join(unicodedata.normalize("NFKC", part or "").split()).casefold()
+        for part in parts
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+# Question fields covered by the content hash
+CONTENT_FIELDS = ("question_text", "choice_a", "choice_b", "choice_c", "choice_d")
+
+
 class Question(models.Model):
     """
     Individual exam question with 4 choices
@@ -60,6 +82,10 @@ class Question(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # question_content_hash() of the text and choices; set on clean/save and
+    # by import_questions (bulk_create skips save)
+    content_hash = models.CharField(max_length=32, null=True, editable=False)
+
     class Meta:
         ordering = ["category", "id"]
 
@@ -75,23 +101,74 @@ class Question(models.Model):
         """Helper to get any choice text by letter"""
         return getattr(self, f"choice_{choice_letter}", "")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Content as loaded, so save() only re-hashes edited questions
+        if set(CONTENT_FIELDS).issubset(field_names):
+            instance._loaded_content = instance._content()
+        return instance
+
+    def _content(self):
+        return tuple(getattr(self, field) for field in CONTENT_FIELDS)
+
+    def content_changed(self):
+        """True for a new question or edited text/choices"""
+        if set(CONTENT_FIELDS).issubset(self.get_deferred_fields()):
+            return False  # Neither loaded nor assigned
+        loaded = getattr(self, "_loaded_content", None)
+        return loaded is None or loaded != self._content()
+
+    def compute_content_hash(self):
+        return question_content_hash(*self._content())
+
+    def clean(self):
+        # Before validate_constraints(), so forms report duplicates nicely
+        if self.content_changed():
+            self.content_hash = self.compute_content_hash()
+
+    def save(self, *args, **kwargs):
+        # Unchanged content keeps its hash, so legacy near-duplicates left
+        # with a NULL hash (migration 0012) can still be recategorized or
+        # deactivated
+        update_fields = kwargs.get("update_fields")
+        if self.content_changed() and (
+            update_fields is None or not set(update_fields).isdisjoint(CONTENT_FIELDS)
+        ):
+            self.content_hash = self.compute_content_hash()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+        if not set(CONTENT_FIELDS) & self.get_deferred_fields():
+            self._loaded_content = self._content()
+
     class Meta:
         ordering = ["category", "id"]
         constraints = [
+            # One narrow index instead of a unique index over five text columns
             models.UniqueConstraint(
-                fields=[
-                    "question_text",
-                    "choice_a",
-                    "choice_b",
-                    "choice_c",
-                    "choice_d",
-                ],
-                name="unique_complete_question",
+                fields=["content_hash"],
+                name="unique_question_content_hash",
                 violation_error_message="A question and answers with this text already exists.",
             )
         ]
 
 
+class QuestionBankVersion(models.Model):
+    """
+    Version of the question bank (single row, pk=1)
+    Bumped whenever a question or category changes; caches derived from the
+    bank are keyed by it. Kept in the database so a change made by one worker
+    process (or a management command) reaches every other process
+    """
+
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Question bank v{self.version}"
+
+
 class ExamSession(models.Model):
     """
     Represents a single exam attempt (no user authentication needed)
@@ -111,8 +188,14 @@ class ExamSession(models.Model):
     paused_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
-    # Total time spent (in seconds) - tracks actual time, not including pauses
-    total_time_spent = models.IntegerField(default=0)  # seconds
+    # Last start/resume/autosave - sweep_sessions abandons long-idle sessions
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    # Server-side exam clock: total_time_spent is the time banked up to
+    # running_since; while the clock runs, elapsed time is computed on read
+    # (see elapsed_time) so nothing has to be written every tick
+    total_time_spent = models.IntegerField(default=0)  # seconds, excludes pauses
+    running_since = models.DateTimeField(null=True, blank=True)  # None = stopped
 
     # Exam duration (4.5 hours = 16200 seconds)
     exam_duration = models.IntegerField(
@@ -141,9 +224,45 @@ class ExamSession(models.Model):
         default=EPPPConfig.PASSING_SCORE
     )  # ASPPB recommended
     correct_answers = models.IntegerField(default=0)
+    answered_questions = models.IntegerField(default=0)  # Denormalized at submit
+
+    # Highest autosave sequence number applied (delta autosave protocol)
+    autosave_seq = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         ordering = ["-started_at"]
+        indexes = [
+            # Results listing: status filter + each sort key + session_id tiebreaker
+            models.Index(
+                fields=["status", "completed_at", "session_id"],
+                name="session_status_date_idx",
+            ),
+            models.Index(
+                fields=["status", "scaled_score", "session_id"],
+                name="session_status_score_idx",
+            ),
+            models.Index(
+                fields=["status", "total_time_spent", "session_id"],
+                name="session_status_time_idx",
+            ),
+            models.Index(
+                fields=["status", "correct_answers", "session_id"],
+                name="session_status_accuracy_idx",
+            ),
+            # sweep_sessions: idle active sessions
+            models.Index(
+                fields=["status", "last_activity_at"],
+                name="session_status_activity_idx",
+            ),
+            # check_active: fingerprint + status lookup, ordered by start time
+            # Partial on a NOT NULL condition, which SQLite (unlike a status
+            # IN (...) condition) can match against bound query parameters
+            models.Index(
+                fields=["browser_fingerprint", "status", "started_at"],
+                condition=Q(browser_fingerprint__isnull=False),
+                name="session_fingerprint_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Session {self.session_id} - {self.status}"
@@ -152,14 +271,74 @@ class ExamSession(models.Model):
         """Check if exam time has expired"""
         if self.status == "completed":
             return False
-        elapsed = self.total_time_spent
+        elapsed = self.elapsed_time()
         return elapsed >= self.exam_duration
 
     def remaining_time(self):
         """Get remaining time in seconds"""
-        return max(0, self.exam_duration - self.total_time_spent)
+        return max(0, self.exam_duration - self.elapsed_time())
+
+    def elapsed_time(self, now=None):
+        """Seconds used so far: banked time plus the running stretch"""
+        if self.running_since is None:
+            return self.total_time_spent
+        now = now or timezone.now()
+        running = int((now - self.running_since).total_seconds())
+        return self.total_time_spent + max(0, running)
+
+    def bank_time(self, now=None):
+        """
+        Fold whole elapsed seconds of the running stretch into total_time_spent
+        running_since advances by the same amount, so no fraction is lost
+        """
+        if self.running_since is None:
+            return
+        now = now or timezone.now()
+        seconds = max(0, int((now - self.running_since).total_seconds()))
+        self.total_time_spent += seconds
+        self.running_since += timedelta(seconds=seconds)
+
+    def start_clock(self, now=None):
+        if self.running_since is None:
+            self.running_since = now or timezone.now()
+
+    def stop_clock(self, now=None):
+        self.bank_time(now)
+        self.running_since = None
+
+    def stop_idle_clock(self, now=None):
+        """
+        Stop a clock left running without a pause (e.g. tab closed): it
+        stops at the last recorded activity, not now. Returns that time
+        """
+        now = now or timezone.now()
+        stopped_at = min(now, max(self.running_since, self.last_activity_at))
+        self.stop_clock(stopped_at)
+        return stopped_at
 
-    def calculate_score(self):
+    def time_from_activities(self, now=None):
+        """
+        Recompute elapsed seconds from the start/pause/resume/submit log
+        (the clock fields are the incrementally maintained form of this)
+        """
+        now = now or timezone.now()
+        total, running_since = 0, None
+
+        activities = self.activities.order_by("timestamp", "id").values_list(
+            "activity_type", "timestamp"
+        )
+        for activity_type, timestamp in activities:
+            if activity_type in ("start", "resume"):
+                running_since = running_since or timestamp
+            elif activity_type in ("pause", "submit") and running_since:
+                total += int((timestamp - running_since).total_seconds())
+                running_since = None
+
+        if running_since is not None:
+            total += int((now - running_since).total_seconds())
+        return total
+
+    def calculate_score(self, correct_answers=None):
         """
         Calculate EPPP-style scaled score (200-800)
 
@@ -167,8 +346,11 @@ class ExamSession(models.Model):
         50 are unscored pretest questions (randomly distributed)
 
         For practice purposes, we score all 225 questions
+        Pass correct_answers when it is already known to skip the COUNT query
         """
-        self.correct_answers = self.exam_questions.filter(is_correct=True).count()
+        if correct_answers is None:
+            correct_answers = self.exam_questions.filter(is_correct=True).count()
+        self.correct_answers = correct_answers
 
         # Calculate percentage based on all 225 questions
         raw_percentage = (self.correct_answers / self.total_questions) * 100
@@ -202,11 +384,73 @@ class ExamSession(models.Model):
 
     @property
     def average_time_per_question(self):
-        """Average seconds per question"""
-        answered = self.exam_questions.exclude(answered_at__isnull=True).count()
+        """Average seconds per answered question (answered_questions is set at submit)"""
+        answered = self.answered_questions
         return round(self.total_time_spent / answered, 1) if answered > 0 else 0
 
 
+class ResultsSummary(models.Model):
+    """
+    Running pass/fail totals over completed sessions (single row, pk=1)
+    Incremented inside the submit transaction (and decremented when a
+    completed session is deleted, see api.signals) so unfiltered results
+    stats are a primary-key read instead of an aggregate over every session
+    """
+
+    total_exams = models.IntegerField(default=0)
+    passed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Results Summary"
+
+    def __str__(self):
+        return f"{self.total_exams} exams ({self.passed} passed)"
+
+    @classmethod
+    def load(cls):
+        """Returns the summary row, rebuilding it if missing"""
+        return cls.objects.filter(pk=1).first() or cls.rebuild()
+
+    @classmethod
+    def record(cls, passed):
+        """Count one newly completed session"""
+        updated = cls.objects.filter(pk=1).update(
+            total_exams=F("total_exams") + 1,
+            passed=F("passed") + int(passed),
+            failed=F("failed") + int(not passed),
+        )
+        if not updated:
+            cls.rebuild()
+
+    @classmethod
+    def discard(cls, session):
+        """Uncount a deleted completed session, as rebuild() counted it"""
+        scored = session.scaled_score is not None
+        passed = scored and session.scaled_score >= session.passing_score
+        updated = cls.objects.filter(pk=1).update(
+            total_exams=F("total_exams") - 1,
+            passed=F("passed") - int(passed),
+            failed=F("failed") - int(scored and not passed),
+        )
+        if not updated:
+            cls.rebuild()
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute the totals from scratch"""
+        stats = ExamSession.objects.filter(
+            status="completed", completed_at__isnull=False
+        ).aggregate(
+            total_exams=Count("session_id"),
+            passed=Count("session_id", filter=Q(scaled_score__gte=F("passing_score"))),
+            failed=Count("session_id", filter=Q(scaled_score__lt=F("passing_score"))),
+        )
+        summary, _ = cls.objects.update_or_create(pk=1, defaults=stats)
+        return summary
+
+
 class ExamQuestion(models.Model):
     """
     Links questions to exam sessions in order
@@ -248,6 +492,12 @@ class ExamQuestion(models.Model):
     # Track if answer is correct (calculated after answering)
     is_correct = models.BooleanField(null=True, blank=True)
 
+    # Autosave sequence number of the last delta applied to each field, so a
+    # late delta for one field isn't rejected by a newer one for another
+    answer_version = models.PositiveBigIntegerField(default=0)  # user_answer
+    review_version = models.PositiveBigIntegerField(default=0)  # marked_for_review
+    time_version = models.PositiveBigIntegerField(default=0)  # time_spent
+
     class Meta:
         ordering = ["session", "question_number"]
         unique_together = ["session", "question_number"]
@@ -267,10 +517,42 @@ class ExamQuestion(models.Model):
         return None
 
 
+class ResultSnapshot(models.Model):
+    """
+    Materialized results report for a completed session
+    A completed session never changes, so the detail report is built once
+    and served as stored JSON (with an ETag for conditional requests)
+    The rendered body is also stored pre-compressed for clients that accept it
+    """
+
+    session = models.OneToOneField(
+        ExamSession,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="result_snapshot",
+    )
+
+    report = models.JSONField()
+    etag = models.CharField(max_length=64)
+    body_gzip = models.BinaryField(null=True)
+    body_br = models.BinaryField(null=True)  # Only when brotli is installed
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Snapshot {self.session_id}"
+
+    @property
+    def encoded_bodies(self):
+        """Stored compressed bodies keyed by content coding"""
+        return {"gzip": self.body_gzip, "br": self.body_br}
+
+
 class SessionActivity(models.Model):
     """
     Track pause/resume events for accurate time tracking
     Optional but useful for debugging and analytics
+
+    Written in batches through api.activity_log, not one row per request
     """
 
     session = models.ForeignKey(
@@ -283,10 +565,12 @@ class SessionActivity(models.Model):
         ("resume", "Resumed"),
         ("submit", "Submitted"),
         ("category_change", "Category Changed"),
+        ("question_view", "Question Viewed"),
+        ("answer_change", "Answer Changed"),
     ]
 
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_CHOICES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Settable for backdating
 
     # Optional metadata
     metadata = models.JSONField(null=True, blank=True)
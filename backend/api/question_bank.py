@@ -0,0 +1,203 @@
+"""
+Process-level caches built on top of the (rarely changing) question bank.
+
+Every cache in this module is keyed by the bank version, a database row
+(QuestionBankVersion) bumped on every question or category change. Each
+process re-reads it at most once per QUESTION_BANK_VERSION_TTL seconds, so
+a change made by another worker or by import_questions is picked up within
+that window without any shared cache backend.
+
+question_pool holds the per-category ID lists used to assemble exams;
+question_bank holds the immutable content (text, choices, answer key,
+explanation, category) that hot endpoints join onto per-session rows.
+"""
+
+import operator
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from api.models import Question, QuestionBankVersion
+
+_version_read = (None, 0.0)  # (version, time.monotonic() of the read)
+
+
+def get_bank_version():
+    """Current question bank version (re-read after QUESTION_BANK_VERSION_TTL)"""
+    global _version_read
+    version, read_at = _version_read
+    now = time.monotonic()
+    if version is None or now - read_at >= settings.QUESTION_BANK_VERSION_TTL:
+        version = _read_bank_version()
+        _version_read = (version, now)
+    return version
+
+
+def bump_bank_version():
+    """Invalidate every cache derived from the question bank, in every process"""
+    global _version_read
+    updated = QuestionBankVersion.objects.filter(pk=1).update(version=F("version") + 1)
+    if not updated:
+        _read_bank_version()  # Seeds a fresh version
+    _version_read = (None, 0.0)  # This process sees the change right away
+
+
+def _read_bank_version():
+    version = (
+        QuestionBankVersion.objects.filter(pk=1)
+        .values_list("version", flat=True)
+        .first()
+    )
+    if version is None:
+        # Seed from the clock so a recreated row never reuses an old version
+        # (cache entries keyed by it may still be around)
+        row, _ = QuestionBankVersion.objects.get_or_create(
+            pk=1, defaults={"version": time.time_ns()}
+        )
+        version = row.version
+    return version
+
+
+class QuestionPool:
+    """
+    Per-category pools of active question IDs
+
+    Exam assembly samples these lists with random.sample instead of running
+    ORDER BY RANDOM() over the question table once per category.
+    """
+
+    CACHE_KEY = "question_pool:{version}"
+    CACHE_TIMEOUT = 60 * 60 * 24  # Old versions simply age out
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._pools = {}
+
+    def get_pools(self):
+        """Returns {category_id: [question_id, ...]} for the current version"""
+        version = get_bank_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._pools = self._load(version)
+                    self._version = version
+        return self._pools
+
+    def _load(self, version):
+        key = self.CACHE_KEY.format(version=version)
+        pools = cache.get(key)
+
+        if pools is None:
+            pools = {}
+            rows = (
+                Question.objects.filter(is_active=True)
+                .order_by()
+                .values_list("category_id", "id")
+            )
+            for category_id, question_id in rows.iterator(chunk_size=5000):
+                pools.setdefault(category_id, []).append(question_id)
+            cache.set(key, pools, timeout=self.CACHE_TIMEOUT)
+
+        return pools
+
+
+question_pool = QuestionPool()
+
+
+class QuestionBank:
+    """
+    Read-only snapshot of question content, keyed by question id
+
+    Each question is one tuple laid out as FIELDS. The active bank is loaded
+    lazily in one query and kept in process memory (not the cache backend,
+    which would unpickle it on every read), then replaced when the bank
+    version changes. Inactive questions that old sessions still reference
+    are fetched on first use and kept until the next version.
+    """
+
+    FIELDS = (
+        "question_text",
+        "choice_a",
+        "choice_b",
+        "choice_c",
+        "choice_d",
+        "correct_answer",
+        "explanation",
+        "category_id",
+        "category__name",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._questions = {}
+
+    def get_questions(self):
+        """Returns {question_id: content tuple} for the current version"""
+        version = get_bank_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._questions = self._load()
+                    self._version = version
+        return self._questions
+
+    def get_many(self, question_ids):
+        """Content tuples for the given ids, loading any missing ones"""
+        questions = self.get_questions()
+        missing = {qid for qid in question_ids if qid not in questions}
+        if missing:
+            rows = Question.objects.filter(id__in=missing).values_list(
+                "id", *self.FIELDS
+            )
+            with self._lock:
+                for question_id, *content in rows:
+                    questions[question_id] = tuple(content)
+        return questions
+
+    def values_list(self, queryset, *lookups):
+        """
+        queryset.values_list(*lookups) for ExamQuestion rows, with the
+        "question__<field>" lookups (FIELDS only) served from the snapshot
+        instead of a JOIN. Returns a list of tuples in `lookups` order.
+        """
+        local = [lookup for lookup in lookups if not lookup.startswith("question__")]
+        if "question_id" not in local:
+            local.append("question_id")
+        question_at = local.index("question_id")
+
+        # Each output tuple is picked from row + content in one C-level call
+        pick = operator.itemgetter(
+            *(
+                (
+                    len(local) + self.FIELDS.index(lookup.removeprefix("question__"))
+                    if lookup.startswith("question__")
+                    else local.index(lookup)
+                )
+                for lookup in lookups
+            )
+        )
+
+        rows = list(queryset.values_list(*local))
+        questions = self.get_many(row[question_at] for row in rows)
+        if len(lookups) == 1:
+            return [(pick(row + questions[row[question_at]]),) for row in rows]
+        return [pick(row + questions[row[question_at]]) for row in rows]
+
+    def _load(self):
+        rows = (
+            Question.objects.filter(is_active=True)
+            .order_by()
+            .values_list("id", *self.FIELDS)
+        )
+        return {
+            question_id: tuple(content)
+            for question_id, *content in rows.iterator(chunk_size=5000)
+        }
+
+
+question_bank = QuestionBank()
@@ -0,0 +1,80 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+Both classes are drop-in replacements for DRF's JSONRenderer/JSONParser and
+produce the same bytes / Python objects with the default (compact, unicode)
+settings. Anything orjson can't reproduce exactly - indented output, ASCII
+escaping, non-str dict keys, oversized integers, malformed input - is handed
+back to the stdlib implementation. Without orjson they behave exactly like
+their parents.
+
+Known difference: non-finite floats render as null instead of raising, and
+floats below 1e-4 or from 1e16 up use the shorter exponent form (1e-05 vs 1e-5).
+"""
+
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson for the common (compact, unicode) case"""
+
+    if orjson is not None:
+        # Let DRF's encoder format datetimes ("Z" suffix, millisecond precision)
+        ORJSON_OPTIONS = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-compatibility escapes as JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser using orjson for UTF-8 request bodies"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Let the stdlib parser decide (NaN when not strict) or raise its ParseError
+            return super().parse(io.BytesIO(body), media_type, parser_context)
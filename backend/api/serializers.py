@@ -2,10 +2,17 @@ from rest_framework import serializers
 from api.models import Category, Question, ExamSession, ExamQuestion
 from rest_framework import serializers
 from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+from api.question_bank import question_bank
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    """Serializer for Category model"""
+    """
+    Serializer for Category model
+    question_count is annotated by CategoryViewSet (one grouped aggregate)
+    """
 
     question_count = serializers.SerializerMethodField()
 
@@ -15,7 +22,10 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
     def get_question_count(self, obj):
-        return obj.questions.filter(is_active=True).count()
+        count = getattr(obj, "question_count", None)
+        if count is None:  # Not annotated
+            count = obj.questions.filter(is_active=True).count()
+        return count
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -112,9 +122,81 @@ class ExamQuestionSerializer(serializers.ModelSerializer):
         ]
 
 
+# (output key, values_list lookup) - same shape as ExamQuestionSerializer
+EXAM_QUESTION_LAYOUT = (
+    ("id", "id"),
+    ("question_id", "question_id"),
+    ("question_number", "question_number"),
+    ("question_text", "question__question_text"),
+    ("choice_a", "question__choice_a"),
+    ("choice_b", "question__choice_b"),
+    ("choice_c", "question__choice_c"),
+    ("choice_d", "question__choice_d"),
+    ("category_id", "question__category_id"),
+    ("category_name", "question__category__name"),
+    ("user_answer", "user_answer"),
+    ("time_spent", "time_spent"),
+    ("marked_for_review", "marked_for_review"),
+    ("first_viewed_at", "first_viewed_at"),
+    ("answered_at", "answered_at"),
+)
+EXAM_QUESTION_KEYS = tuple(key for key, _ in EXAM_QUESTION_LAYOUT)
+EXAM_QUESTION_LOOKUPS = tuple(lookup for _, lookup in EXAM_QUESTION_LAYOUT)
+EXAM_QUESTION_DATETIME_KEYS = ("first_viewed_at", "answered_at")
+
+
+def serialize_exam_questions(exam_questions):
+    """
+    Fast path for ExamQuestionSerializer(exam_questions, many=True).data
+
+    Reads plain tuples via values_list() and zips them onto a precomputed
+    key layout instead of walking DRF fields and dotted sources per row.
+    Question content comes from the in-memory question bank, not a JOIN.
+    Produces the same JSON.
+    """
+    rows = question_bank.values_list(
+        exam_questions.order_by("question_number"), *EXAM_QUESTION_LOOKUPS
+    )
+    return exam_question_rows_to_dicts(rows)
+
+
+def _datetime_formatter():
+    """
+    Same output as DateTimeField.to_representation, with the timezone
+    lookup hoisted out of the per-row loop
+    """
+    if api_settings.DATETIME_FORMAT != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    tz = timezone.get_current_timezone()
+
+    def to_iso(value):
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return to_iso
+
+
+def exam_question_rows_to_dicts(rows):
+    """Turn EXAM_QUESTION_LOOKUPS tuples into serializer-shaped dicts"""
+    to_datetime = _datetime_formatter()
+    keys = EXAM_QUESTION_KEYS
+    data = []
+
+    for row in rows:
+        item = dict(zip(keys, row))
+        for key in EXAM_QUESTION_DATETIME_KEYS:
+            if item[key] is not None:
+                item[key] = to_datetime(item[key])
+        data.append(item)
+
+    return data
+
+
 class ExamSessionSerializer(serializers.ModelSerializer):
     """Serializer for ExamSession"""
 
+    total_time_spent = serializers.SerializerMethodField()  # Live server clock
     remaining_time = serializers.SerializerMethodField()
 
     class Meta:
@@ -140,6 +222,9 @@ class ExamSessionSerializer(serializers.ModelSerializer):
             "correct_answers",
         ]
 
+    def get_total_time_spent(self, obj):
+        return obj.elapsed_time()
+
     def get_remaining_time(self, obj):
         return obj.remaining_time()
 
@@ -252,6 +337,25 @@ class QuestionReviewSerializer(serializers.ModelSerializer):
         ]
 
 
+# (output key, values_list lookup) - same shape as QuestionReviewSerializer
+QUESTION_REVIEW_LAYOUT = (
+    ("question_number", "question_number"),
+    ("question_text", "question__question_text"),
+    ("category", "question__category__name"),
+    ("choice_a", "question__choice_a"),
+    ("choice_b", "question__choice_b"),
+    ("choice_c", "question__choice_c"),
+    ("choice_d", "question__choice_d"),
+    ("user_answer", "user_answer"),
+    ("correct_answer", "question__correct_answer"),
+    ("is_correct", "is_correct"),
+    ("explanation", "question__explanation"),
+    ("time_spent", "time_spent"),
+)
+QUESTION_REVIEW_KEYS = tuple(key for key, _ in QUESTION_REVIEW_LAYOUT)
+QUESTION_REVIEW_LOOKUPS = tuple(lookup for _, lookup in QUESTION_REVIEW_LAYOUT)
+
+
 class ExamResultsDetailSerializer(serializers.ModelSerializer):
     """
     Comprehensive exam results serializer with all analytics
@@ -499,8 +603,7 @@ class ExamResultsDetailSerializer(serializers.ModelSerializer):
         Complete question-by-question review
         Returns: array of all questions with user answers, correct answers, explanations
         """
-        questions = obj.exam_questions.select_related(
-            "question", "question__category"
-        ).order_by("question_number")
-
-        return QuestionReviewSerializer(questions, many=True).data
+        rows = question_bank.values_list(
+            obj.exam_questions.order_by("question_number"), *QUESTION_REVIEW_LOOKUPS
+        )
+        return [dict(zip(QUESTION_REVIEW_KEYS, row)) for row in rows]
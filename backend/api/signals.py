@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import Category, ExamSession, Question, ResultsSummary
+from api.question_bank import bump_bank_version
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_question_bank(sender, **kwargs):
+    """Question added, edited, deactivated or recategorized; category edited"""
+    transaction.on_commit(bump_bank_version)
+
+
+@receiver(post_delete, sender=ExamSession)
+def discount_deleted_session(sender, instance, **kwargs):
+    """Keep the results summary in step when a completed session is deleted"""
+    if instance.status == "completed" and instance.completed_at is not None:
+        ResultsSummary.discard(instance)
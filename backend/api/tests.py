@@ -1,3 +1,534 @@
-from django.test import TestCase
+import base64
+import json
+import math
+from datetime import timedelta
 
-# Create your tests here.
+from unittest import skipUnless
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.analytics import ExamAnalyticsBuilder
+from api.autosave_buffer import AutosaveBuffer
+from api.helpers import create_exam_session, sweep_sessions
+from api.models import (
+    Category,
+    ExamQuestion,
+    ExamSession,
+    Question,
+    ResultsSummary,
+    SessionActivity,
+)
+from api.question_bank import bump_bank_version, get_bank_version, question_bank
+
+
+def create_question_bank(categories=9, per_category=25):
+    """Enough active questions for full 225-question exams"""
+    questions = []
+    for number in range(1, categories + 1):
+        category = Category.objects.create(name=f"Category {number}")
+        for n in range(per_category):
+            question = Question(
+                category=category,
+                question_text=f"{category.name}, question {n}?",
+                choice_a=f"First choice {n}",
+                choice_b=f"Second choice {n}",
+                choice_c=f"Third choice {n}",
+                choice_d=f"Fourth choice {n}",
+                correct_answer="abcd"[n % 4],
+                explanation=f"Explanation {n}",
+            )
+            question.content_hash = question.compute_content_hash()
+            questions.append(question)
+    Question.objects.bulk_create(questions)
+
+    # bulk_create skips the signal, and on_commit never fires in a TestCase
+    bump_bank_version()
+
+
+# Long enough that no test sees the bank version re-read mid-measurement
+@override_settings(QUESTION_BANK_VERSION_TTL=3600)
+class ExamTestCase(TestCase):
+    """A question bank plus one started exam session"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_question_bank()
+
+    def setUp(self):
+        self.session = create_exam_session(browser_fingerprint="test-browser")
+        self.exam_questions = list(
+            self.session.exam_questions.order_by("question_number")
+        )
+        get_bank_version()  # Warm the per-process version read
+
+
+class AutosaveQueryTests(ExamTestCase):
+    """
+    Autosave runs the same queries whatever the number of answers
+    The one bulk UPDATE is only split into the batches the database backend
+    requires (SQLite caps bound parameters; PostgreSQL needs one statement)
+    """
+
+    def autosave(self, count, user_answer, **data):
+        """SQL run by one autosave of `count` answers"""
+        answers = [
+            {"question_id": eq.id, "user_answer": user_answer, "time_spent": 5}
+            for eq in self.exam_questions[:count]
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f"/api/exam-sessions/{self.session.session_id}/autosave/",
+                {"answers": answers, **data},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], count)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def assertSameQueries(self, small, large, rows):
+        # Bulk statements and the rows each can write for `rows` answers
+        # (a first view and an answer change per answer)
+        batched = {
+            'UPDATE "api_examquestion"': (ExamQuestion, rows),
+            'INSERT INTO "api_sessionactivity"': (SessionActivity, 2 * rows),
+        }
+
+        def is_batch(sql):
+            return sql.startswith(tuple(batched))
+
+        self.assertEqual(
+            [sql.split()[0] for sql in small if not is_batch(sql)],
+            [sql.split()[0] for sql in large if not is_batch(sql)],
+        )
+        for prefix, (model, count) in batched.items():
+            self.assertLessEqual(sum(sql.startswith(prefix) for sql in small), 1)
+
+            # At most what bulk_update/bulk_create need to write every column
+            fields = ["pk", "pk", *model._meta.concrete_fields]
+            batch_size = connection.ops.bulk_batch_size(fields, range(count))
+            self.assertLessEqual(
+                sum(sql.startswith(prefix) for sql in large),
+                math.ceil(count / batch_size),
+            )
+
+    def test_query_count_is_constant(self):
+        one = self.autosave(1, "a")
+        everything = self.autosave(225, "b")
+        self.assertSameQueries(one, everything, 225)
+
+    def test_delta_query_count_is_constant(self):
+        one = self.autosave(1, "a", seq=1)
+        everything = self.autosave(225, "b", seq=2)
+        self.assertSameQueries(one, everything, 225)
+
+    @override_settings(ACTIVITY_LOG_BUFFERED=False)
+    def test_unbuffered_activity_log_query_count_is_constant(self):
+        one = self.autosave(1, "a")
+        everything = self.autosave(225, "b")
+        self.assertSameQueries(one, everything, 225)
+        self.assertEqual(
+            SessionActivity.objects.filter(activity_type="answer_change").count(),
+            226,
+        )
+
+
+class AutosaveDeltaTests(ExamTestCase):
+    """Delta autosave versions each field separately"""
+
+    def autosave(self, seq, **answer):
+        exam_question = self.exam_questions[0]
+        response = self.client.patch(
+            f"/api/exam-sessions/{self.session.session_id}/autosave/",
+            {"seq": seq, "answers": [{"question_id": exam_question.id, **answer}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        exam_question.refresh_from_db()
+        return exam_question
+
+    def test_late_delta_for_another_field_applies(self):
+        self.autosave(3, marked_for_review=True)
+        exam_question = self.autosave(2, user_answer="b")
+        self.assertEqual(exam_question.user_answer, "b")
+        self.assertTrue(exam_question.marked_for_review)
+
+    def test_late_delta_for_the_same_field_is_skipped(self):
+        self.autosave(3, user_answer="c", marked_for_review=True)
+        exam_question = self.autosave(2, user_answer="b", marked_for_review=False)
+        self.assertEqual(exam_question.user_answer, "c")
+        self.assertTrue(exam_question.marked_for_review)
+
+
+class AutosaveBufferTests(ExamTestCase):
+    """Buffered saves keep each field at the seq it was sent with"""
+
+    def setUp(self):
+        super().setUp()
+        self.buffer = AutosaveBuffer()
+        self.buffer._ensure_worker = lambda: None  # Flushed by hand
+
+    def add(self, seq, **answer):
+        answer["question_id"] = self.exam_questions[0].id
+        self.buffer.add(self.session.session_id, {"answers": [answer]}, seq=seq)
+
+    def flushed_question(self):
+        self.buffer.flush(self.session.session_id)
+        exam_question = self.exam_questions[0]
+        exam_question.refresh_from_db()
+        return exam_question
+
+    def test_fields_merge_at_their_own_seq(self):
+        self.add(3, marked_for_review=True)
+        self.add(1, user_answer="a")
+        self.add(2, user_answer="b")
+        exam_question = self.flushed_question()
+        self.assertEqual(exam_question.user_answer, "b")
+        self.assertTrue(exam_question.marked_for_review)
+        self.assertEqual(exam_question.answer_version, 2)
+        self.assertEqual(exam_question.review_version, 3)
+
+    def test_failed_write_is_requeued_under_newer_saves(self):
+        self.add(3, marked_for_review=True)
+        self.add(1, user_answer="a")
+
+        def fail(batch):
+            raise RuntimeError("database unavailable")
+
+        self.buffer._write = fail
+        with self.assertRaises(RuntimeError), self.assertLogs("api.autosave_buffer"):
+            self.buffer.flush(self.session.session_id)
+        del self.buffer._write
+
+        self.add(2, user_answer="b")
+        self.add(2, marked_for_review=False)  # Older than the requeued flag
+        exam_question = self.flushed_question()
+        self.assertEqual(exam_question.user_answer, "b")
+        self.assertTrue(exam_question.marked_for_review)
+        self.assertEqual(exam_question.answer_version, 2)
+        self.assertEqual(exam_question.review_version, 3)
+
+
+class AnalyticsQueryTests(ExamTestCase):
+    """The analytics report reads the session's questions in one pass"""
+
+    def setUp(self):
+        super().setUp()
+        answers = [
+            {"question_id": eq.id, "user_answer": "abcd"[n % 4], "time_spent": 30}
+            for n, eq in enumerate(self.exam_questions[:150])
+        ]
+        response = self.client.post(
+            f"/api/exam-sessions/{self.session.session_id}/submit/",
+            {"answers": answers},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.session.refresh_from_db()
+
+    def build_report(self):
+        with CaptureQueriesContext(connection) as queries:
+            report = ExamAnalyticsBuilder(self.session).build_report("manual")
+        return report, len(queries)
+
+    def test_report_takes_at_most_two_queries(self):
+        # Content not in the snapshot yet: the exam questions plus one load
+        question_bank.get_questions().clear()
+        report, queries = self.build_report()
+        self.assertLessEqual(queries, 2)
+        self.assertEqual(report["answers"]["answered"], 150)
+        self.assertEqual(len(report["questions"]), 225)
+
+        # Warm snapshot: the exam questions only
+        _, queries = self.build_report()
+        self.assertEqual(queries, 1)
+
+
+class ResultsListQueryTests(TestCase):
+    """The results list costs the same whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        ExamSession.objects.bulk_create(
+            ExamSession(
+                status="completed",
+                completed_at=now - timedelta(minutes=n),
+                total_time_spent=3600 + n,
+                correct_answers=100 + n,
+                answered_questions=200,
+                scaled_score=300 + n * 4,
+            )
+            for n in range(60)
+        )
+        ResultsSummary.rebuild()
+
+    def list_results(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/results/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        small, small_queries = self.list_results(page_size=5)
+        large, large_queries = self.list_results(page_size=50)
+        self.assertEqual(len(small["results"]), 5)
+        self.assertEqual(len(large["results"]), 50)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_cursor_query_count_does_not_depend_on_page_size(self):
+        small, small_queries = self.list_results(pagination="cursor", page_size=5)
+        large, large_queries = self.list_results(pagination="cursor", page_size=50)
+        self.assertEqual(len(small["results"]), 5)
+        self.assertEqual(len(large["results"]), 50)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_cursor_pages_follow_on(self):
+        first, _ = self.list_results(pagination="cursor", sort="score", page_size=5)
+        second, _ = self.list_results(
+            sort="score", page_size=5, cursor=first["next_cursor"]
+        )
+        first_ids = {row["session_id"] for row in first["results"]}
+        second_ids = {row["session_id"] for row in second["results"]}
+        self.assertEqual(len(second_ids), 5)
+        self.assertFalse(first_ids & second_ids)
+
+    def test_tampered_cursor_is_not_found(self):
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({"v": "abc", "id": "x", "r": False}).encode()
+        ).decode()
+        response = self.client.get("/api/results/", {"sort": "score", "cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+class ResultsSummaryTests(TestCase):
+    """The running totals follow sessions being deleted"""
+
+    def setUp(self):
+        now = timezone.now()
+        self.passed, self.failed = (
+            ExamSession.objects.create(
+                status="completed", completed_at=now, scaled_score=score
+            )
+            for score in (600, 400)
+        )
+        ResultsSummary.rebuild()
+
+    def stats(self):
+        response = self.client.get("/api/results/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["stats"]
+
+    def test_deleting_a_session_updates_the_stats(self):
+        self.assertEqual(self.stats()["passed"], 1)
+        response = self.client.delete(f"/api/exam-sessions/{self.passed.session_id}/")
+        self.assertEqual(response.status_code, 204)
+
+        stats = self.stats()
+        self.assertEqual((stats["passed"], stats["failed"]), (0, 1))
+        self.assertEqual(
+            ResultsSummary.objects.get(pk=1).total_exams,
+            ResultsSummary.rebuild().total_exams,
+        )
+
+    def test_deleting_an_unfinished_session_keeps_the_stats(self):
+        ExamSession.objects.create(status="in_progress").delete()
+        summary = ResultsSummary.objects.get(pk=1)
+        self.assertEqual((summary.total_exams, summary.passed), (2, 1))
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class SessionIndexTests(TestCase):
+    """Session lookups run by the views are index searches, not table scans"""
+
+    # Results list sort key -> the index its page query should search
+    SORT_INDEXES = {
+        "date": "session_status_date_idx",
+        "score": "session_status_score_idx",
+        "time": "session_status_time_idx",
+        "accuracy": "session_status_accuracy_idx",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        statuses = ("in_progress", "paused", "completed", "expired", "abandoned")
+        ExamSession.objects.bulk_create(
+            ExamSession(
+                browser_fingerprint=f"browser-{n % 50}" if n % 3 else None,
+                status=statuses[n % len(statuses)],
+                completed_at=now if n % len(statuses) == 2 else None,
+                scaled_score=200 + n % 600,
+                correct_answers=n % 225,
+                total_time_spent=n * 7,
+            )
+            for n in range(500)
+        )
+        ResultsSummary.rebuild()
+
+    def session_plans(self, request, *args, **kwargs):
+        """EXPLAIN QUERY PLAN of each ExamSession query the request runs"""
+        with CaptureQueriesContext(connection) as queries:
+            response = request(*args, **kwargs)
+        self.assertEqual(response.status_code, 200)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if '"api_examsession"' in query["sql"]:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    plans.append(" / ".join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def test_check_active_uses_fingerprint_index(self):
+        plans = self.session_plans(
+            self.client.post,
+            "/api/exam-sessions/check-active/",
+            {"browser_fingerprint": "browser-7"},
+            content_type="application/json",
+        )
+        for plan in plans:
+            self.assertIn("USING INDEX session_fingerprint_status_idx", plan)
+
+    def test_results_list_uses_status_indexes(self):
+        for key, index in self.SORT_INDEXES.items():
+            for sort in (key, f"-{key}"):
+                for pagination in ("page", "cursor"):
+                    with self.subTest(sort=sort, pagination=pagination):
+                        plans = self.session_plans(
+                            self.client.get,
+                            "/api/results/",
+                            {"sort": sort, "pagination": pagination},
+                        )
+                        for plan in plans:
+                            self.assertRegex(
+                                plan, r"USING (COVERING )?INDEX session_status_"
+                            )
+                        self.assertIn(f"USING INDEX {index}", plans[-1])
+
+
+class SweepSessionsTests(ExamTestCase):
+    """
+    The sweeper and resume count a running clock the same way: only up to
+    the last recorded activity, so a closed tab doesn't run the time out
+    """
+
+    def backdate(self, hours, active_for=0, **fields):
+        """Clock started `hours` ago, last activity `active_for` seconds later"""
+        started = timezone.now() - timedelta(hours=hours)
+        ExamSession.objects.filter(pk=self.session.pk).update(
+            running_since=started,
+            last_activity_at=started + timedelta(seconds=active_for),
+            **fields,
+        )
+
+    def sweep(self):
+        result = sweep_sessions(idle_before=timezone.now() - timedelta(days=7))
+        self.session.refresh_from_db()
+        return result
+
+    def resume(self):
+        response = self.client.get(
+            f"/api/exam-sessions/{self.session.session_id}/resume/"
+        )
+        self.session.refresh_from_db()
+        return response
+
+    def test_clock_run_out_while_active_is_expired(self):
+        self.client.patch(
+            f"/api/exam-sessions/{self.session.session_id}/autosave/",
+            {
+                "answers": [
+                    {"question_id": self.exam_questions[0].id, "user_answer": "a"}
+                ]
+            },
+            content_type="application/json",
+        )
+        self.backdate(5, active_for=self.session.exam_duration + 60)
+
+        self.assertEqual(self.sweep(), {"expired": 1, "abandoned": 0})
+        self.assertEqual(self.session.status, "expired")
+        self.assertIsNone(self.session.running_since)
+        self.assertEqual(self.session.answered_questions, 1)
+        self.assertIsNotNone(self.session.scaled_score)
+        self.assertEqual(self.session.total_time_spent, self.session.exam_duration)
+
+    def test_idle_running_clock_is_kept(self):
+        self.backdate(5, active_for=600)
+        self.assertEqual(self.sweep(), {"expired": 0, "abandoned": 0})
+        self.assertEqual(self.session.status, "in_progress")
+
+    def test_running_clock_with_time_left_is_kept(self):
+        self.backdate(1, active_for=600, total_time_spent=600)
+        self.assertEqual(self.sweep(), {"expired": 0, "abandoned": 0})
+        self.assertEqual(self.session.status, "in_progress")
+
+    def test_resume_after_idle_gap_keeps_the_time_used(self):
+        self.backdate(5, active_for=600)
+        self.assertEqual(self.resume().status_code, 200)
+        self.assertEqual(self.session.status, "in_progress")
+        self.assertEqual(self.session.total_time_spent, 600)
+
+    def test_resume_agrees_with_the_sweeper(self):
+        self.backdate(5, active_for=self.session.exam_duration)
+        self.assertEqual(self.resume().status_code, 400)
+        self.assertEqual(self.session.status, "expired")
+        self.assertEqual(self.session.total_time_spent, self.session.exam_duration)
+
+
+class QuestionContentHashTests(TestCase):
+    """Legacy near-duplicates (NULL content_hash) stay editable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ethics = Category.objects.create(name="Ethics")
+        cls.assessment = Category.objects.create(name="Assessment")
+        fields = {
+            "category": cls.ethics,
+            "choice_a": "Always",
+            "choice_b": "Never",
+            "choice_c": "Sometimes",
+            "choice_d": "Rarely",
+            "correct_answer": "c",
+            "explanation": "Because.",
+        }
+        cls.original = Question.objects.create(question_text="Is it OK?", **fields)
+        # As left by migration 0012: differs only in case, so no hash
+        cls.legacy = Question.objects.bulk_create(
+            [Question(question_text="is it ok?", **fields)]
+        )[0]
+
+    def test_recategorize_legacy_duplicate(self):
+        response = self.client.patch(
+            "/api/questions/update-category/",
+            {"question_id": self.legacy.id, "new_category_id": self.assessment.id},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.legacy.refresh_from_db()
+        self.assertEqual(self.legacy.category, self.assessment)
+        self.assertIsNone(self.legacy.content_hash)
+
+    def test_deactivate_legacy_duplicate(self):
+        question = Question.objects.get(pk=self.legacy.pk)
+        question.is_active = False
+        question.full_clean()
+        question.save()
+        self.assertFalse(Question.objects.get(pk=self.legacy.pk).is_active)
+
+    def test_editing_into_a_duplicate_is_rejected(self):
+        question = Question.objects.get(pk=self.legacy.pk)
+        question.question_text = "Is  it OK?"
+        with self.assertRaises(ValidationError):
+            question.full_clean()
+
+    def test_edited_content_is_rehashed(self):
+        question = Question.objects.get(pk=self.legacy.pk)
+        question.question_text = "Is it ever OK?"
+        question.save(update_fields=["question_text"])
+        question.refresh_from_db()
+        self.assertEqual(question.content_hash, question.compute_content_hash())
@@ -36,6 +36,7 @@ EXAM SESSIONS (Active Management):
 ✓ POST   /api/exam-sessions/check-active/
 ✓ GET    /api/exam-sessions/{session_id}/
 ✓ GET    /api/exam-sessions/{session_id}/resume/
+✓ GET    /api/exam-sessions/{session_id}/paper/
 ✓ PATCH  /api/exam-sessions/{session_id}/autosave/
 ✓ POST   /api/exam-sessions/{session_id}/submit/
 
@@ -27,6 +27,7 @@ EXAM SESSIONS (Active Session Management):
 - POST   /api/exam-sessions/check-active/          - Check for active session
 - GET    /api/exam-sessions/{session_id}/          - Get session details
 - GET    /api/exam-sessions/{session_id}/resume/   - Resume existing session
+- GET    /api/exam-sessions/{session_id}/paper/    - Immutable question content (compact mode)
 - PATCH  /api/exam-sessions/{session_id}/autosave/ - Auto-save progress
 - POST   /api/exam-sessions/{session_id}/submit/   - Submit and complete exam
 
@@ -1,9 +1,17 @@
-from rest_framework import viewsets
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from api.models import (
     Category,
 )
 from api.serializers import CategorySerializer
+from api.helpers import etag_matches
+from api.question_bank import get_bank_version
+from api.renderers import FastJSONRenderer
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -11,8 +19,38 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     API endpoint for categories
     GET /api/categories/ - List all categories
     GET /api/categories/{id}/ - Get category details
+
+    Active question counts come from one grouped aggregate. The listing is
+    cached per question bank version (bumped on Question/Category writes)
+    and revalidated by clients with its ETag.
     """
 
-    queryset = Category.objects.all().order_by("id")
+    queryset = Category.objects.annotate(
+        question_count=Count("questions", filter=Q(questions__is_active=True))
+    ).order_by("id")
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+
+    LIST_CACHE_TIMEOUT = 60 * 60 * 24  # Old versions simply age out
+    LIST_MAX_AGE = 300  # Seconds browsers may reuse a listing unchecked
+
+    def list(self, request, *args, **kwargs):
+        # Pagination links are absolute, so key on the full URL
+        url = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+        key = f"category_list:{get_bank_version()}:{url}"
+
+        listing = cache.get(key)
+        if listing is None:
+            data = super().list(request, *args, **kwargs).data
+            body = FastJSONRenderer().render(data)
+            listing = {"data": data, "etag": hashlib.sha256(body).hexdigest()[:32]}
+            cache.set(key, listing, timeout=self.LIST_CACHE_TIMEOUT)
+
+        etag = f'"{listing["etag"]}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.LIST_MAX_AGE}",
+        }
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(listing["data"], headers=headers)
@@ -5,9 +5,25 @@ from rest_framework.permissions import AllowAny
 from django.utils import timezone
 from django.db import transaction
 import json
-from api.models import ExamSession, ExamQuestion, SessionActivity
-from api.serializers import ExamSessionSerializer, ExamQuestionSerializer
-from api.helpers import create_exam_session
+from api.models import ExamSession, ExamQuestion, ResultsSummary
+from api.serializers import ExamSessionSerializer, serialize_exam_questions
+from api.helpers import (
+    ANSWER_ROW_FIELDS,
+    apply_answers,
+    create_exam_session,
+    etag_matches,
+    expire_sessions,
+    get_exam_paper,
+    get_exam_paper_encoded,
+    get_exam_state,
+    index_answers,
+    log_answer_events,
+    save_answers,
+    save_progress,
+)
+from api.activity_log import activity_log
+from api.autosave_buffer import autosave_buffer
+from api.compression import precompressed_response
 
 
 class ExamSessionViewSet(viewsets.ModelViewSet):
@@ -31,6 +47,7 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
         }
 
         Returns: Complete session with all 225 questions
+        With ?compact=1: session + answer state tuples + paper_id (see paper)
         """
         browser_fingerprint = request.data.get("browser_fingerprint")
 
@@ -38,15 +55,14 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
             # Create exam session with balanced questions
             session = create_exam_session(browser_fingerprint=browser_fingerprint)
 
-            # Get all exam questions for this session
-            exam_questions = session.exam_questions.select_related(
-                "question",
-                "question__category",
-            ).all()
+            if self._wants_compact(request):
+                return Response(
+                    self._compact_payload(session), status=status.HTTP_201_CREATED
+                )
 
-            # Serialize session and questions
+            # Serialize session and questions (tuple fast path)
             session_data = ExamSessionSerializer(session).data
-            questions_data = ExamQuestionSerializer(exam_questions, many=True).data
+            questions_data = serialize_exam_questions(session.exam_questions)
 
             return Response(
                 {"session": session_data, "questions": questions_data},
@@ -63,8 +79,12 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
         Resume an existing exam session
 
         Returns: Session data with all questions and their current state
+        With ?compact=1: session + answer state tuples + paper_id (see paper)
         """
         try:
+            # Buffered autosaves must land before we read the session back
+            autosave_buffer.flush(session_id)
+
             session = self.get_object()
 
             # Check if session is resumable
@@ -74,32 +94,45 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Check if time expired
+            now = timezone.now()
+
+            # Left running without a pause (tab closed): the clock stopped
+            # at the last recorded activity, not now
+            if session.running_since is not None:
+                paused_at = session.stop_idle_clock(now)
+                session.save(update_fields=["total_time_spent", "running_since"])
+                activity_log.log(
+                    session.session_id,
+                    "pause",
+                    timestamp=paused_at,
+                    metadata={"implicit": True},
+                )
+
+            # Check if time expired, idle time not counted (same rule and
+            # scoring as the sweeper, see timed_out_sessions)
             if session.is_expired():
-                session.status = "expired"
-                session.save()
+                expire_sessions([session.session_id])
                 return Response(
                     {"error": "Session time has expired"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Resume the session
+            # Resume the session and restart the clock
             session.status = "in_progress"
+            session.start_clock(now)
+            session.last_activity_at = now
             session.save()
 
             # Log resume activity
-            SessionActivity.objects.create(session=session, activity_type="resume")
+            activity_log.log(session.session_id, "resume", timestamp=now)
 
-            # Get all questions
-            exam_questions = session.exam_questions.select_related(
-                "question",
-                "question__category",
-            ).all()
+            if self._wants_compact(request):
+                return Response(self._compact_payload(session))
 
             return Response(
                 {
                     "session": ExamSessionSerializer(session).data,
-                    "questions": ExamQuestionSerializer(exam_questions, many=True).data,
+                    "questions": serialize_exam_questions(session.exam_questions),
                 }
             )
 
@@ -108,13 +141,121 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
                 {"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=True, methods=["get"])
+    def paper(self, request, session_id=None):
+        """
+        GET /api/exam-sessions/{session_id}/paper/
+        GET /api/exam-sessions/{session_id}/paper/?v={paper_id}
+
+        Immutable question content for compact start/resume payloads.
+        Rows follow "fields"; paper_id is a content hash, so a request
+        pinned with ?v= is cacheable for good.
+        """
+        paper = get_exam_paper(self.get_object())
+        paper_id = paper["paper_id"]
+        etag = f'"{paper_id}"'
+
+        pinned = request.query_params.get("v") == paper_id
+        headers = {
+            "ETag": etag,
+            "Cache-Control": (
+                "private, max-age=31536000, immutable"
+                if pinned
+                else "private, no-cache"
+            ),
+        }
+
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # Compressed once per paper rather than per request
+        if request.accepted_renderer.format == "json":
+            response = precompressed_response(
+                request, get_exam_paper_encoded(paper), "application/json", headers
+            )
+            if response is not None:
+                return response
+
+        return Response(paper, headers=headers)
+
+    @action(detail=True, methods=["post"])
+    def pause(self, request, session_id=None):
+        """
+        POST /api/exam-sessions/{session_id}/pause/
+
+        Body: { "paused": true }    (false restarts the clock)
+
+        Stops or restarts the server-side exam clock. Time is computed
+        from these transitions, so autosave isn't needed to advance it.
+
+        Returns: { "status", "total_time_spent", "remaining_time" }
+        """
+        paused = request.data.get("paused", True)
+        if not isinstance(paused, bool):
+            return Response(
+                {"error": "paused must be a boolean"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            try:
+                session = ExamSession.objects.select_for_update().get(
+                    session_id=session_id
+                )
+            except ExamSession.DoesNotExist:
+                return Response(
+                    {"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+            if session.status not in ["in_progress", "paused"]:
+                return Response(
+                    {"error": "Session is not active", "status": session.status},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            now = timezone.now()
+            running = session.running_since is not None
+
+            # Repeated calls are no-ops (e.g. a pause beacon after a pause)
+            if paused and running:
+                session.stop_clock(now)
+                session.status = "paused"
+                session.paused_at = now
+                activity = "pause"
+            elif not paused and not running:
+                session.start_clock(now)
+                session.status = "in_progress"
+                activity = "resume"
+            else:
+                activity = None
+
+            if activity:
+                session.last_activity_at = now
+                session.save(
+                    update_fields=[
+                        "status",
+                        "paused_at",
+                        "total_time_spent",
+                        "running_since",
+                        "last_activity_at",
+                    ]
+                )
+                activity_log.log(session.session_id, activity, timestamp=now)
+
+        return Response(
+            {
+                "status": session.status,
+                "total_time_spent": session.elapsed_time(now),
+                "remaining_time": session.remaining_time(),
+            }
+        )
+
     @action(detail=True, methods=["patch"])
     def autosave(self, request, session_id=None):
         """
         PATCH /api/exam-sessions/{session_id}/autosave/
 
         Body: {
-            "total_time_spent": 3600,
             "current_question_number": 45,
             "answers": [
                 {
@@ -125,6 +266,22 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
                 }
             ]
         }
+
+        Delta mode: add a monotonic "seq" and send only the fields that
+        changed since the last acknowledged save. Versions are kept per
+        field (answer, review flag, time), so a delta only loses a field
+        to a newer delta for that same field; a late delta for another
+        field still applies. Clients should resend unacknowledged changes
+        with their next seq.
+
+        Body: {
+            "seq": 42,
+            "answers": [{"question_id": "123", "marked_for_review": true}]
+        }
+
+        Elapsed time is kept by the server clock (see pause); a
+        "total_time_spent" field is accepted for old clients but ignored.
+        Returns the server's remaining_time so the client can resync.
         """
 
         try:
@@ -138,55 +295,47 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
 
         session = self.get_object()
 
-        for d in data.items():
-            print(d)
-
         if session.status not in ["in_progress", "paused"]:
             return Response(
                 {"error": "Session is not active"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        with transaction.atomic():
-
-            # Update session fields
-            session.total_time_spent = data.get(
-                "total_time_spent", session.total_time_spent
-            )
-            session.current_question_number = data.get(
-                "current_question_number", session.current_question_number
+        try:
+            seq = int(data["seq"]) if data.get("seq") is not None else None
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "seq must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            session.save()
 
-            # Bulk update answers
-            answers_data = request.data.get("answers", [])
-
-            for answer in answers_data:
-                exam_q = ExamQuestion.objects.filter(
-                    session=session, id=answer["question_id"]
-                ).first()
-
-                if not exam_q:
-                    continue
-
-                # ✅ ALWAYS set first_viewed_at if not set (even for null answers)
-                if not exam_q.first_viewed_at:
-                    exam_q.first_viewed_at = timezone.now()
-
-                # ✅ Always update time_spent and marked (even if user_answer is null)
-                exam_q.time_spent = answer.get("time_spent", 0)
-                exam_q.marked_for_review = answer.get("marked_for_review", False)
-
-                # ✅ Only update answer fields if user actually answered
-                user_answer = answer.get("user_answer")
+        # Write-behind mode: acknowledge now, persist on the next flush
+        if autosave_buffer.enabled:
+            autosave_buffer.add(session.session_id, data, seq=seq)
+            return Response(
+                {
+                    "status": "queued",
+                    "seq": seq,
+                    "remaining_time": session.remaining_time(),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
 
-                if user_answer is not None:  # ✅ Changed: explicit None check
-                    exam_q.user_answer = user_answer
-                    exam_q.answered_at = timezone.now()
-                    exam_q.check_answer()
+        with transaction.atomic():
+            # Update session fields
+            save_progress(session, data, seq=seq)
 
-                exam_q.save()
+            # ✅ Bulk update answers (one SELECT + one UPDATE, whatever the size)
+            updated = save_answers(session, data.get("answers", []), seq=seq)
 
-        return Response({"status": "saved"}, status=200)
+        return Response(
+            {
+                "status": "saved",
+                "seq": session.autosave_seq,
+                "updated": updated,
+                "remaining_time": session.remaining_time(),
+            },
+            status=200,
+        )
 
     @action(detail=True, methods=["post"])
     def submit(self, request, session_id=None):
@@ -196,6 +345,9 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
         Submit and complete exam with comprehensive analytics.
         Submission type automatically inferred from remaining_time.
         """
+        # Always persist buffered autosaves before grading
+        autosave_buffer.flush(session_id)
+
         try:
             session = self.get_object()
         except ExamSession.DoesNotExist:
@@ -234,75 +386,99 @@ class ExamSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        with transaction.atomic():
-            try:
-                # ✅ Update session final state
-                session.total_time_spent = data.get(
-                    "total_time_spent", session.total_time_spent
+        try:
+            with transaction.atomic():
+                # ✅ Lock the session row once and re-check it under the lock
+                session = ExamSession.objects.select_for_update().get(
+                    session_id=session.session_id
+                )
+                if session.status not in ["in_progress", "paused"]:
+                    return Response(
+                        {
+                            "error": f"Cannot submit session with status: {session.status}",
+                            "session_id": str(session.session_id),
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+                # ✅ Update session final state (time from the server clock)
+                now = timezone.now()
+                session.stop_clock(now)
+                session.total_time_spent = min(
+                    session.total_time_spent, session.exam_duration
                 )
                 session.current_question_number = data.get(
                     "current_question_number", session.current_question_number
                 )
 
-                # ✅ Bulk update answers
-                for answer in data.get("answers", []):
-                    try:
-                        exam_q = ExamQuestion.objects.select_for_update().get(
-                            session=session, id=answer.get("question_id")
-                        )
-
-                        if not exam_q.first_viewed_at:
-                            exam_q.first_viewed_at = timezone.now()
-
-                        exam_q.time_spent = answer.get("time_spent", exam_q.time_spent)
-                        exam_q.marked_for_review = answer.get(
-                            "marked_for_review", False
-                        )
-
-                        user_answer = answer.get("user_answer")
-                        if user_answer is not None:
-                            exam_q.user_answer = user_answer
-                            exam_q.answered_at = timezone.now()
-                            exam_q.check_answer()
-
-                        exam_q.save()
-                    except ExamQuestion.DoesNotExist:
-                        continue
+                # ✅ Load every row once, apply final answers in memory
+                exam_questions = list(
+                    ExamQuestion.objects.filter(session=session)
+                    .select_related("question")
+                    .only(*ANSWER_ROW_FIELDS)
+                )
+                events = []
+                changed_rows, changed_fields = apply_answers(
+                    exam_questions,
+                    index_answers(data.get("answers", [])),
+                    events=events,
+                )
+                if changed_rows:
+                    ExamQuestion.objects.bulk_update(
+                        changed_rows, sorted(changed_fields)
+                    )
+                log_answer_events(session, events)
 
-                # ✅ Mark complete and calculate scores
+                # ✅ Mark complete and score from the in-memory rows
                 session.status = "completed"
-                session.completed_at = timezone.now()
-                session.correct_answers = session.exam_questions.filter(
-                    is_correct=True
-                ).count()
-                session.calculate_score()
+                session.completed_at = now
+                session.answered_questions = sum(
+                    1 for eq in exam_questions if eq.answered_at is not None
+                )
+                session.calculate_score(
+                    correct_answers=sum(1 for eq in exam_questions if eq.is_correct)
+                )
                 session.save()
+                ResultsSummary.record(passed=session.passed)
 
                 # ✅ Infer submission type from remaining time
                 remaining_time = session.remaining_time()
                 submission_type = "timeout" if remaining_time == 0 else "manual"
 
                 # ✅ Log activity
-                SessionActivity.objects.create(
-                    session=session,
-                    activity_type="submit",
+                activity_log.log(
+                    session.session_id,
+                    "submit",
+                    timestamp=now,
                     metadata={"submission_type": submission_type},
                 )
 
-                # ✅ Return response
-                return Response(
-                    {
-                        "message": "Exam submitted successfully.",
-                        "session_id": str(session.session_id),
-                    },
-                    status=status.HTTP_200_OK,
-                )
+        except Exception as e:
+            return Response(
+                {"error": f"Error submitting exam: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-            except Exception as e:
-                return Response(
-                    {"error": f"Error submitting exam: {str(e)}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+        # ✅ Return response
+        return Response(
+            {
+                "message": "Exam submitted successfully.",
+                "session_id": str(session.session_id),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def _wants_compact(request):
+        return request.query_params.get("compact") in ("1", "true")
+
+    @staticmethod
+    def _compact_payload(session):
+        """Session + small mutable state; question content lives in paper"""
+        return {
+            "session": ExamSessionSerializer(session).data,
+            **get_exam_state(session),
+        }
 
     @action(detail=False, methods=["post"], url_path="check-active")
     def check_active(self, request):
@@ -3,12 +3,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.db.models import Q, Count, F
-from api.models import ExamSession
-from api.serializers import (
-    ExamResultsListSerializer,
-    ExamResultsDetailSerializer,
+from api.models import ExamSession, ResultsSummary
+from api.serializers import ExamResultsListSerializer
+from api.helpers import (
+    ResultsCursorPagination,
+    ResultsPagination,
+    etag_matches,
+    get_result_snapshot,
 )
-from api.helpers import ResultsPagination
+from api.compression import negotiate_encoding, precompressed_response
 
 
 class ResultsViewSet(viewsets.ReadOnlyModelViewSet):
@@ -40,6 +43,7 @@ class ResultsViewSet(viewsets.ReadOnlyModelViewSet):
                 "session_id",
                 "scaled_score",
                 "correct_answers",
+                "answered_questions",
                 "total_questions",
                 "completed_at",
                 "total_time_spent",
@@ -64,16 +68,33 @@ class ResultsViewSet(viewsets.ReadOnlyModelViewSet):
         }
 
         sort_key = self.request.query_params.get("sort", "-date")
-        queryset = queryset.order_by(SORT_MAPPING.get(sort_key, "-completed_at"))
+        sort_field = SORT_MAPPING.get(sort_key, "-completed_at")
+
+        # session_id tiebreaker (same direction) keeps the order stable for
+        # keyset pagination and matches the composite indexes
+        tiebreak = "-session_id" if sort_field.startswith("-") else "session_id"
+        queryset = queryset.order_by(sort_field, tiebreak)
 
         return queryset
 
+    @property
+    def paginator(self):
+        """Page numbers by default, keyset pagination with ?cursor= / ?pagination=cursor"""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            use_cursor = "cursor" in params or params.get("pagination") == "cursor"
+            self._paginator = (
+                ResultsCursorPagination() if use_cursor else self.pagination_class()
+            )
+        return self._paginator
+
     def list(self, request, *args, **kwargs):
         """
         GET /api/results/
         GET /api/results/?page=2
         GET /api/results/?search=abc123
         GET /api/results/?sort=-score
+        GET /api/results/?pagination=cursor&sort=-score   (then ?cursor=<next_cursor>)
 
         Returns paginated list of completed exam results WITH global stats
         """
@@ -81,11 +102,24 @@ class ResultsViewSet(viewsets.ReadOnlyModelViewSet):
         base_queryset = self.get_queryset()
 
         # Calculate stats on the FULL filtered queryset (not just current page)
-        stats = base_queryset.aggregate(
-            total_exams=Count("session_id"),
-            passed=Count("session_id", filter=Q(scaled_score__gte=F("passing_score"))),
-            failed=Count("session_id", filter=Q(scaled_score__lt=F("passing_score"))),
-        )
+        # Unfiltered stats come from the running totals kept by submit and delete
+        if request.query_params.get("search"):
+            stats = base_queryset.aggregate(
+                total_exams=Count("session_id"),
+                passed=Count(
+                    "session_id", filter=Q(scaled_score__gte=F("passing_score"))
+                ),
+                failed=Count(
+                    "session_id", filter=Q(scaled_score__lt=F("passing_score"))
+                ),
+            )
+        else:
+            summary = ResultsSummary.load()
+            stats = {
+                "total_exams": summary.total_exams,
+                "passed": summary.passed,
+                "failed": summary.failed,
+            }
 
         # Calculate average pass rate
         total = stats["total_exams"]
@@ -126,18 +160,36 @@ class ResultsViewSet(viewsets.ReadOnlyModelViewSet):
         GET /api/results/{session_id}/
 
         Get full results with category breakdown and question-level analytics
+        Served from a stored snapshot; supports If-None-Match -> 304
+        Clients accepting gzip/br get the stored compressed body as-is
         """
-        try:
-            # Prefetch related data for optimal performance
-            session = ExamSession.objects.prefetch_related(
-                "exam_questions__question__category"
-            ).get(session_id=kwargs.get("session_id"), status="completed")
-
-            serializer = ExamResultsDetailSerializer(session)
-            return Response(serializer.data)
+        precompressed = (
+            request.accepted_renderer.format == "json"
+            and negotiate_encoding(request) is not None
+        )
+        # Only load the columns this response can use
+        defer = ("report",) if precompressed else ("body_gzip", "body_br")
 
+        try:
+            snapshot = get_result_snapshot(kwargs.get("session_id"), defer=defer)
         except ExamSession.DoesNotExist:
             return Response(
                 {"error": "Exam results not found or exam not completed"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+
+        etag = f'"{snapshot.etag}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        # Completed results never change - let the client reuse its copy
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if precompressed:
+            response = precompressed_response(
+                request, snapshot.encoded_bodies, "application/json", headers
+            )
+            if response is not None:
+                return response
+
+        return Response(snapshot.report, headers=headers)
@@ -25,6 +25,21 @@ env = environ.Env(
     SECRET_KEY=(str, "change-me-in-production"),
     GUNICORN_WORKERS=(int, 4),
     LOG_LEVEL=(str, "INFO"),
+    AUTOSAVE_BUFFER_ENABLED=(bool, False),
+    AUTOSAVE_FLUSH_INTERVAL=(int, 5),
+    ACTIVITY_LOG_BUFFERED=(bool, True),
+    ACTIVITY_LOG_BATCH_SIZE=(int, 500),
+    ACTIVITY_LOG_MAX_QUEUE=(int, 10000),
+    ACTIVITY_LOG_FLUSH_INTERVAL=(int, 2),
+    FAST_JSON_ENABLED=(bool, True),
+    QUESTION_BANK_VERSION_TTL=(int, 2),
+    DB_CONN_MAX_AGE=(int, 0),
+    DB_CONN_HEALTH_CHECKS=(bool, True),
+    DB_POOL=(bool, False),
+    DB_POOL_MIN_SIZE=(int, 2),
+    DB_POOL_MAX_SIZE=(int, 10),
+    SQLITE_TUNING=(bool, True),
+    SQLITE_BUSY_TIMEOUT=(int, 20),
 )
 
 # Read .env file if it exists
@@ -58,6 +73,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.compression.CompressionMiddleware",  # gzip/brotli, compresses last
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,14 +83,23 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# JSON encoding - api.renderers uses orjson when installed, stdlib otherwise
+if env("FAST_JSON_ENABLED"):
+    JSON_RENDERER_CLASS = "api.renderers.FastJSONRenderer"
+    JSON_PARSER_CLASS = "api.renderers.FastJSONParser"
+else:
+    JSON_RENDERER_CLASS = "rest_framework.renderers.JSONRenderer"
+    JSON_PARSER_CLASS = "rest_framework.parsers.JSONParser"
+
 # REST Framework Configuration (Modern)
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        JSON_RENDERER_CLASS,
+        # Browsable API only in development
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        JSON_PARSER_CLASS,
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 100,
@@ -86,6 +111,23 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Autosave write-behind buffer (api/autosave_buffer.py)
+# Pending saves live in the worker process - keep GUNICORN_WORKERS=1 when enabled
+AUTOSAVE_BUFFER_ENABLED = env("AUTOSAVE_BUFFER_ENABLED")
+AUTOSAVE_FLUSH_INTERVAL = env("AUTOSAVE_FLUSH_INTERVAL")  # seconds
+
+# Session activity log (api/activity_log.py)
+# Events are queued per process and written with bulk_create; a full queue drops
+ACTIVITY_LOG_BUFFERED = env("ACTIVITY_LOG_BUFFERED")
+ACTIVITY_LOG_BATCH_SIZE = env("ACTIVITY_LOG_BATCH_SIZE")  # rows per INSERT
+ACTIVITY_LOG_MAX_QUEUE = env("ACTIVITY_LOG_MAX_QUEUE")
+ACTIVITY_LOG_FLUSH_INTERVAL = env("ACTIVITY_LOG_FLUSH_INTERVAL")  # seconds
+
+# Question bank caches (api/question_bank.py) are keyed by a version stored in
+# the database; each process re-reads it at most this often (seconds), so
+# question edits and imports reach every worker within this window
+QUESTION_BANK_VERSION_TTL = env("QUESTION_BANK_VERSION_TTL")
+
 # ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS")
 
@@ -144,12 +186,44 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# SQLite file by default; e.g. DATABASE_URL=postgres://exam:exam@db:5432/exam
+DATABASES = {"default": env.db("DATABASE_URL")}
+
+# Persistent connections suit WSGI/runserver; under the ASGI workers
+# (scripts/py_run.sh) keep DB_CONN_MAX_AGE=0 and use DB_POOL instead
+DATABASES["default"]["CONN_MAX_AGE"] = env("DB_CONN_MAX_AGE")
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env("DB_CONN_HEALTH_CHECKS")
+
+# psycopg 3 connection pool (PostgreSQL only, needs psycopg[pool])
+if env("DB_POOL") and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # Pooling replaces persistent connections
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": env("DB_POOL_MIN_SIZE"),
+        "max_size": env("DB_POOL_MAX_SIZE"),
     }
-}
+
+# SQLite tuning for concurrent autosaves (SQLITE_TUNING=False for stock behaviour)
+# WAL lets reads run alongside the single writer, IMMEDIATE takes the write lock
+# at BEGIN (so a waiting transaction honours the busy timeout instead of
+# failing with "database is locked" on lock upgrade), and synchronous=NORMAL
+# is durable across application crashes in WAL mode
+if (
+    env("SQLITE_TUNING")
+    and DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3"
+):
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=134217728;"  # 128 MiB
+                "PRAGMA cache_size=-20000;"  # ~20 MiB
+                "PRAGMA temp_store=MEMORY;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": env("SQLITE_BUSY_TIMEOUT"),  # seconds
+        }
+    )
 
 
 # Password validation
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: ExamQuestionSerializer(many=True) vs the values_list fast path
+
+Runs entirely in memory (no database): the DRF serializer walks unsaved
+model instances, the fast path converts the equivalent values_list tuples.
+
+Usage (from backend/):
+    python scripts/bench_exam_question_serializer.py
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", "")
+
+import django
+
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Category, ExamQuestion, Question
+from api.serializers import (
+    EXAM_QUESTION_LOOKUPS,
+    ExamQuestionSerializer,
+    exam_question_rows_to_dicts,
+)
+
+ROW_COUNTS = (225, 2000)
+REPEATS = 5
+
+
+def build_fixtures(count):
+    """Unsaved ExamQuestions plus the matching values_list tuples"""
+    categories = [Category(id=i, name=f"Category {i}") for i in range(1, 10)]
+    now = timezone.now()
+    instances, rows = [], []
+
+    for i in range(1, count + 1):
+        question = Question(
+            id=i,
+            category=categories[i % 9],
+            question_text=f"Question {i} " + "lorem ipsum " * 20,
+            choice_a="choice a " * 5,
+            choice_b="choice b " * 5,
+            choice_c="choice c " * 5,
+            choice_d="choice d " * 5,
+            correct_answer="a",
+        )
+        answered = now if i % 2 else None
+        exam_q = ExamQuestion(
+            id=i,
+            question=question,
+            question_number=i,
+            user_answer="b" if answered else None,
+            time_spent=i % 90,
+            marked_for_review=i % 7 == 0,
+            first_viewed_at=answered,
+            answered_at=answered,
+        )
+        instances.append(exam_q)
+
+        values = {
+            "id": exam_q.id,
+            "question_id": question.id,
+            "question_number": exam_q.question_number,
+            "question__question_text": question.question_text,
+            "question__choice_a": question.choice_a,
+            "question__choice_b": question.choice_b,
+            "question__choice_c": question.choice_c,
+            "question__choice_d": question.choice_d,
+            "question__category_id": question.category.id,
+            "question__category__name": question.category.name,
+            "user_answer": exam_q.user_answer,
+            "time_spent": exam_q.time_spent,
+            "marked_for_review": exam_q.marked_for_review,
+            "first_viewed_at": exam_q.first_viewed_at,
+            "answered_at": exam_q.answered_at,
+        }
+        rows.append(tuple(values[lookup] for lookup in EXAM_QUESTION_LOOKUPS))
+
+    return instances, rows
+
+
+def main():
+    renderer = JSONRenderer()
+    print(f"{'rows':>6} {'DRF (ms)':>10} {'fast (ms)':>10} {'speedup':>8}  same JSON")
+
+    for count in ROW_COUNTS:
+        instances, rows = build_fixtures(count)
+
+        def drf():
+            return ExamQuestionSerializer(instances, many=True).data
+
+        def fast():
+            return exam_question_rows_to_dicts(rows)
+
+        same = renderer.render(drf()) == renderer.render(fast())
+        drf_ms = min(timeit.repeat(drf, number=1, repeat=REPEATS)) * 1000
+        fast_ms = min(timeit.repeat(fast, number=1, repeat=REPEATS)) * 1000
+
+        print(
+            f"{count:>6} {drf_ms:>10.2f} {fast_ms:>10.2f} "
+            f"{drf_ms / fast_ms:>7.1f}x  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
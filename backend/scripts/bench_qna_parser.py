@@ -0,0 +1,199 @@
+"""
+Benchmark: streaming Q&A parser vs the previous whole-file regex parser
+
+Writes synthetic exam dumps (questions + answers files, multi-line choices
+and explanations on the answer line) of increasing size to a temp
+directory, then times both parsers on each size and checks they return
+the same records. Time per question should stay flat for the streaming
+parser (linear scaling). Peak memory is measured on the largest dump.
+
+Usage (from backend/):
+    python scripts/bench_qna_parser.py [--questions 50000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from q_n_a_pre_processing import QuestionAnswerProcessor
+
+WORDS = (
+    "memory attention cortex reinforcement schedule validity reliability "
+    "variance cohort anxiety therapy supervision ethics consent norm bias "
+    "learning stimulus response neuron dopamine serotonin assessment"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def write_dump(directory, count, seed=0):
+    """Questions and answers files with `count` questions"""
+    rng = random.Random(seed)
+    questions = directory / f"exam_{count}.txt"
+    answers = directory / f"exam_{count}_Answers.txt"
+
+    with open(questions, "w", encoding="utf-8") as q, open(
+        answers, "w", encoding="utf-8"
+    ) as a:
+        q.write("PRACTICE EXAM\n\n")
+        for number in range(1, count + 1):
+            q.write(f"{number}. {sentence(rng, 18)}?\n")
+            for letter in "abcd":
+                q.write(f"   {letter}. {sentence(rng, 6)}\n")
+                if rng.random() < 0.3:  # Choice wrapped onto a second line
+                    q.write(f"      {sentence(rng, 5).lower()}\n")
+            q.write("\n")
+
+            answer = rng.choice("ABCD")
+            if rng.random() < 0.9:
+                a.write(f"{number}.\t{answer}-- {sentence(rng, 40)}.\n")
+            else:
+                a.write(f"{number}.\t{answer}\n")
+
+    return questions, answers
+
+
+# The previous implementation, kept here for comparison
+def legacy_parse_questions(questions_text):
+    questions = []
+    pattern = r"(\d+)\.\s+(.*?)(?=\n\d+\.\s+|$)"
+    for q_num, q_content in re.findall(pattern, questions_text, re.DOTALL):
+        lines = q_content.strip().split("\n")
+        choices = {"a": "", "b": "", "c": "", "d": ""}
+        current_choice, current_text = None, []
+        for line in lines[1:]:
+            line = line.strip()
+            if not line:
+                continue
+            choice_match = re.match(r"^([a-d])\.\s+(.*)", line)
+            if choice_match:
+                if current_choice is not None:
+                    choices[current_choice] = " ".join(current_text).strip()
+                current_choice = choice_match.group(1)
+                current_text = [choice_match.group(2).strip()]
+            elif current_choice is not None:
+                current_text.append(line)
+        if current_choice is not None:
+            choices[current_choice] = " ".join(current_text).strip()
+        questions.append(
+            {
+                "number": int(q_num),
+                "question_text": lines[0].strip(),
+                "choice_a": choices["a"],
+                "choice_b": choices["b"],
+                "choice_c": choices["c"],
+                "choice_d": choices["d"],
+            }
+        )
+    return questions
+
+
+def legacy_parse_answers(answers_text):
+    answers, found = [], set()
+    pattern = r"(\d+)\.[\s\t]+([A-D])--\s*(.*?)(?=\n\d+\.[\s\t]|$)"
+    for num, correct, explanation in re.findall(
+        pattern, answers_text, re.DOTALL | re.MULTILINE
+    ):
+        answers.append(
+            {
+                "number": int(num),
+                "correct_answer": correct.lower(),
+                "explanation": explanation.strip(),
+            }
+        )
+        found.add(int(num))
+    pattern_simple = r"(\d+)\.[\s\t]+([A-D])[\s\t]*$"
+    for num, correct in re.findall(pattern_simple, answers_text, re.MULTILINE):
+        if int(num) not in found:
+            answers.append(
+                {
+                    "number": int(num),
+                    "correct_answer": correct.lower(),
+                    "explanation": "",
+                }
+            )
+    answers.sort(key=lambda x: x["number"])
+    return answers
+
+
+def run_legacy(questions, answers):
+    questions_text = questions.read_text(encoding="utf-8")
+    answers_text = answers.read_text(encoding="utf-8")
+    return legacy_parse_questions(questions_text), legacy_parse_answers(answers_text)
+
+
+def run_streaming(questions, answers):
+    with open(questions, encoding="utf-8") as qf, open(answers, encoding="utf-8") as af:
+        return (
+            list(QuestionAnswerProcessor.iter_questions(qf)),
+            sorted(QuestionAnswerProcessor.iter_answers(af), key=lambda x: x["number"]),
+        )
+
+
+def count_streaming(questions, answers):
+    """Consume the generators without keeping records (constant memory)"""
+    with open(questions, encoding="utf-8") as qf, open(answers, encoding="utf-8") as af:
+        return sum(1 for _ in QuestionAnswerProcessor.iter_questions(qf)) + sum(
+            1 for _ in QuestionAnswerProcessor.iter_answers(af)
+        )
+
+
+def timed(fn, *args):
+    began = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - began
+
+
+def peak_memory(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=50000)
+    args = parser.parse_args()
+
+    sizes = [args.questions // 4, args.questions // 2, args.questions]
+    print(
+        f"{'questions':>9} {'MiB':>6} {'legacy (s)':>11} {'stream (s)':>11} "
+        f"{'µs/q legacy':>12} {'µs/q stream':>12}  same records"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            questions, answers = write_dump(Path(tmp), count)
+            size = (questions.stat().st_size + answers.stat().st_size) / 2**20
+
+            legacy, legacy_s = timed(run_legacy, questions, answers)
+            streaming, stream_s = timed(run_streaming, questions, answers)
+
+            print(
+                f"{count:>9} {size:>6.1f} {legacy_s:>11.2f} {stream_s:>11.2f} "
+                f"{legacy_s / count * 1e6:>12.1f} {stream_s / count * 1e6:>12.1f}"
+                f"  {legacy == streaming}"
+            )
+
+        print(f"\nPeak memory parsing {count} questions ({size:.1f} MiB of input):")
+        for label, fn in (
+            ("legacy (whole files + regex)", run_legacy),
+            ("streaming, records kept", run_streaming),
+            ("streaming, records consumed", count_streaming),
+        ):
+            print(f"  {label:<30} {peak_memory(fn, questions, answers):7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
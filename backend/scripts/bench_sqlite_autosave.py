@@ -0,0 +1,187 @@
+"""
+Concurrency benchmark: autosave PATCHes against SQLite, stock vs tuned
+
+Each mode runs in a fresh subprocess with its own throwaway database
+(SQLITE_TUNING=False, then True). Like gunicorn workers, every client is a
+separate process with its own connection: each owns one exam session and
+autosaves it in a loop while two reader processes resume sessions.
+Reports the "database is locked" error rate and autosave latency.
+
+Usage (from backend/):
+    python scripts/bench_sqlite_autosave.py [--clients 16] [--requests 50]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+MODES = (("stock", "False"), ("tuned", "True"))
+READER_PROCESSES = 2
+
+
+def run_worker(clients, requests):
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import OperationalError, connection
+    from rest_framework.test import APIClient
+
+    from api.helpers import create_exam_session
+    from api.models import Category, Question
+
+    call_command("migrate", verbosity=0)
+    for c in range(9):
+        category = Category.objects.create(name=f"Category {c}")
+        Question.objects.bulk_create(
+            Question(
+                category=category,
+                question_text=f"Question {c}-{i}",
+                choice_a="a",
+                choice_b="b",
+                choice_c="c",
+                choice_d="d",
+                correct_answer="abcd"[i % 4],
+            )
+            for i in range(40)
+        )
+
+    sessions = []
+    for i in range(clients):
+        session = create_exam_session(browser_fingerprint=f"bench-{i}")
+        question_ids = list(session.exam_questions.values_list("id", flat=True))
+        sessions.append((str(session.session_id), question_ids))
+    connection.close()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    start = context.Barrier(clients + READER_PROCESSES)
+    done = context.Event()
+
+    def writer(session_id, question_ids):
+        client = APIClient()
+        latencies, errors = [], 0
+        start.wait()
+        for n in range(requests):
+            payload = {
+                "total_time_spent": n,
+                "current_question_number": n % 225 + 1,
+                "answers": [
+                    {"question_id": qid, "user_answer": random.choice("abcd")}
+                    for qid in random.sample(question_ids, 5)
+                ],
+            }
+            began = time.perf_counter()
+            try:
+                response = client.patch(
+                    f"/api/exam-sessions/{session_id}/autosave/",
+                    payload,
+                    format="json",
+                )
+                failed = response.status_code != 200
+            except OperationalError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - began)
+        results.put((latencies, errors))
+
+    def reader():
+        client = APIClient()
+        start.wait()
+        while not done.is_set():
+            session_id, _ = random.choice(sessions)
+            try:
+                client.get(f"/api/exam-sessions/{session_id}/resume/")
+            except OperationalError:
+                pass
+
+    writers = [context.Process(target=writer, args=s) for s in sessions]
+    readers = [context.Process(target=reader) for _ in range(READER_PROCESSES)]
+    for process in writers + readers:
+        process.start()
+    began = time.perf_counter()
+
+    latencies, errors = [], 0
+    for _ in writers:
+        process_latencies, process_errors = results.get()
+        latencies.extend(process_latencies)
+        errors += process_errors
+    wall = time.perf_counter() - began
+    done.set()
+    for process in writers + readers:
+        process.join()
+
+    latencies.sort()
+    total = len(latencies) + errors
+    print(
+        json.dumps(
+            {
+                "requests": total,
+                "errors": errors,
+                "throughput": total / wall,
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "p99": latencies[int(len(latencies) * 0.99)] if latencies else None,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args.clients, args.requests)
+
+    print(f"{args.clients} writer processes x {args.requests} autosaves")
+    print(f"{'mode':<6} {'errors':>12} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+
+    for mode, tuning in MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.sqlite3",
+                "SQLITE_TUNING": tuning,
+                "ALLOWED_HOSTS": "testserver",
+                "CORS_ALLOWED_ORIGINS": os.environ.get("CORS_ALLOWED_ORIGINS", ""),
+            }
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", *sys.argv[1:]],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+
+        error_rate = result["errors"] / result["requests"] * 100
+        p50, p99 = (
+            f"{result[key] * 1000:9.1f}" if result[key] is not None else f"{'-':>9}"
+            for key in ("p50", "p99")
+        )
+        print(
+            f"{mode:<6} {result['errors']:>5} ({error_rate:4.1f}%) "
+            f"{result['throughput']:8.1f} {p50} {p99}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
+import io
 import re
 import os
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -52,15 +53,12 @@ class QuestionAnswerProcessor:
         9: "Industrial Organizational",
     }
 
-    def __init__(
-        self, naming_convention: str, sql_table_name: str, auto_run: bool = False
-    ):
+    def __init__(self, naming_convention: str, auto_run: bool = False):
         """
         Initialize the processor
 
         Args:
             naming_convention: Base name for files (e.g., "Exam_1")
-            sql_table_name: Name of SQL table for inserts
             auto_run: If True, runs without user prompts
         """
         print(f"\n{'='*70}")
@@ -68,7 +66,6 @@ class QuestionAnswerProcessor:
         print(f"{'='*70}")
 
         self.naming_convention = naming_convention
-        self.sql_table_name = sql_table_name
         self.auto_run = auto_run
         self.stats = ProcessingStats()
         self.current_stage = ProcessingStage.INIT
@@ -100,7 +97,6 @@ class QuestionAnswerProcessor:
         self.prompt_file = Path(str(base) + "_Categorization_Prompt.txt")
         self.categories_response_file = Path(str(base) + "_Categories_Response.json")
         self.final_json = Path(str(base) + "_Final.json")
-        self.sql_file = Path(str(base) + "_Insert.sql")
 
         print(f"📝 Questions file: {self.questions_file.name}")
         print(f"📝 Answers file: {self.answers_file.name}")
@@ -134,126 +130,161 @@ class QuestionAnswerProcessor:
             input(f"⏸️  {message}\n   Press ENTER to continue... ")
             print()
 
-    @staticmethod
-    def parse_questions(questions_text: str) -> List[Dict]:
-        """Parse questions from text - handles multi-line choices"""
-        questions = []
-
-        # Split by question numbers, but be more careful about boundaries
-        pattern = r"(\d+)\.\s+(.*?)(?=\n\d+\.\s+|$)"
-        matches = re.findall(pattern, questions_text, re.DOTALL)
-
-        for match in matches:
-            q_num = match[0]
-            q_content = match[1].strip()
-
-            # Split content into lines
-            lines = q_content.split("\n")
-            question_text = lines[0].strip()
-
-            choices = {"a": "", "b": "", "c": "", "d": ""}
-            current_choice = None
-            current_text = []
-
-            for line in lines[1:]:
-                # Remove excessive whitespace but keep the line
-                line = line.strip()
-                if not line:
-                    continue
+    # Line patterns, compiled once. A question starts on a line beginning
+    # with "N. "; answers look like "N. B-- explanation" or just "N. B"
+    QUESTION_START = re.compile(r"(\d+)\.\s+(.*)")
+    CHOICE_START = re.compile(r"([a-d])\.\s+(.*)")
+    ANSWER_FULL = re.compile(r"\s*(\d+)\.\s+([A-D])--\s*(.*)")
+    ANSWER_BARE = re.compile(r"\s*(\d+)\.\s+([A-D])\s*$")
 
-                # Check if this line starts a new choice (a., b., c., or d.)
-                choice_match = re.match(r"^([a-d])\.\s+(.*)", line)
-
-                if choice_match:
-                    # Save previous choice if exists
-                    if current_choice is not None:
-                        choices[current_choice] = " ".join(current_text).strip()
+    @classmethod
+    def iter_questions(cls, lines: Iterable[str]) -> Iterator[Dict]:
+        """
+        Parse questions from an iterable of lines (e.g. an open file) in a
+        single pass, yielding each question as soon as the next one starts.
+        Handles multi-line choices; lines before the first question are skipped.
+        """
+        question_start = cls.QUESTION_START.match
+        choice_start = cls.CHOICE_START.match
 
-                    # Start new choice
-                    current_choice = choice_match.group(1)
-                    current_text = [choice_match.group(2).strip()]
-                else:
-                    # This is a continuation of the current choice
-                    if current_choice is not None:
-                        current_text.append(line)
+        number = None
+        question_text = ""
+        choices = {}
+        current_choice = None
+        current_text = []
 
-            # Save the last choice
+        def build():
             if current_choice is not None:
                 choices[current_choice] = " ".join(current_text).strip()
+            return {
+                "number": number,
+                "question_text": question_text,
+                "choice_a": choices.get("a", ""),
+                "choice_b": choices.get("b", ""),
+                "choice_c": choices.get("c", ""),
+                "choice_d": choices.get("d", ""),
+            }
+
+        for line in lines:
+            start = question_start(line)
+            if start:
+                if number is not None:
+                    yield build()
+                number = int(start.group(1))
+                question_text = start.group(2).strip()
+                choices = {}
+                current_choice = None
+                current_text = []
+                continue
 
-            questions.append(
-                {
-                    "number": int(q_num),
-                    "question_text": question_text,
-                    "choice_a": choices["a"],
-                    "choice_b": choices["b"],
-                    "choice_c": choices["c"],
-                    "choice_d": choices["d"],
-                }
-            )
-
-        return questions
-
-    @staticmethod
-    def parse_answers(answers_text: str) -> List[Dict]:
-        """Parse answers and explanations from text"""
-        answers = []
-
-        # First try the standard pattern with "--"
-        pattern = r"(\d+)\.[\s\t]+([A-D])--\s*(.*?)(?=\n\d+\.[\s\t]|$)"
-        matches = re.findall(pattern, answers_text, re.DOTALL | re.MULTILINE)
-
-        # Track which question numbers we found
-        found_numbers = set()
-
-        for match in matches:
-            a_num = int(match[0])
-            correct = match[1].lower()
-            explanation = match[2].strip()
-
-            answers.append(
-                {
-                    "number": a_num,
-                    "correct_answer": correct,
-                    "explanation": explanation,
-                }
-            )
-            found_numbers.add(a_num)
+            if number is None:
+                continue
 
-        # Now look for answers without "--" (just letter answers)
-        # Pattern: number, period, whitespace/tab, letter A-D, end of line
-        pattern_simple = r"(\d+)\.[\s\t]+([A-D])[\s\t]*$"
-        simple_matches = re.findall(pattern_simple, answers_text, re.MULTILINE)
+            # Remove excessive whitespace but keep the line
+            line = line.strip()
+            if not line:
+                continue
 
-        for match in simple_matches:
-            a_num = int(match[0])
-            # Skip if we already found this answer with the full pattern
-            if a_num in found_numbers:
+            # "12." on its own line: the text follows on the next one
+            if not question_text:
+                question_text = line
                 continue
 
-            correct = match[1].lower()
-            answers.append(
-                {
-                    "number": a_num,
-                    "correct_answer": correct,
+            # Check if this line starts a new choice (a., b., c., or d.)
+            choice = choice_start(line)
+            if choice:
+                # Save previous choice if exists
+                if current_choice is not None:
+                    choices[current_choice] = " ".join(current_text).strip()
+                current_choice = choice.group(1)
+                current_text = [choice.group(2).strip()]
+            elif current_choice is not None:
+                # This is a continuation of the current choice
+                current_text.append(line)
+
+        if number is not None:
+            yield build()
+
+    @classmethod
+    def iter_answers(cls, lines: Iterable[str]) -> Iterator[Dict]:
+        """
+        Parse answers and explanations from an iterable of lines in a single
+        pass. A bare "N. B" answer is skipped when an "N. B-- ..." answer for
+        the same question came earlier; when it comes later it is yielded
+        after (and so overrides) the bare one.
+        """
+        answer_full = cls.ANSWER_FULL.match
+        answer_bare = cls.ANSWER_BARE.match
+
+        with_explanation = set()
+        pending = None  # "N. B--" with the explanation on the next line
+
+        for line in lines:
+            full = answer_full(line)
+            bare = None if full else answer_bare(line)
+
+            if pending is not None:
+                if not (full or bare):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    pending["explanation"] = line
+                    yield pending
+                    pending = None
+                    continue
+                yield pending
+                pending = None
+
+            if full:
+                number = int(full.group(1))
+                with_explanation.add(number)
+                answer = {
+                    "number": number,
+                    "correct_answer": full.group(2).lower(),
+                    "explanation": full.group(3).strip(),
+                }
+                if answer["explanation"]:
+                    yield answer
+                else:
+                    pending = answer
+            elif bare and int(bare.group(1)) not in with_explanation:
+                yield {
+                    "number": int(bare.group(1)),
+                    "correct_answer": bare.group(2).lower(),
                     "explanation": "",  # No explanation provided
                 }
-            )
 
-        # Sort by number
-        answers.sort(key=lambda x: x["number"])
+        if pending is not None:
+            yield pending
 
+    @classmethod
+    def parse_questions(cls, questions_text: str) -> List[Dict]:
+        """Parse questions from text - handles multi-line choices"""
+        return list(cls.iter_questions(io.StringIO(questions_text)))
+
+    @classmethod
+    def parse_answers(cls, answers_text: str) -> List[Dict]:
+        """Parse answers and explanations from text, sorted by number"""
+        answers = list(cls.iter_answers(io.StringIO(answers_text)))
+        answers.sort(key=lambda x: x["number"])
         return answers
 
     def merge_questions_answers(
-        self, questions: List[Dict], answers: List[Dict]
+        self, questions: Iterable[Dict], answers: Iterable[Dict]
     ) -> Tuple[List[Dict], List[int], List[int]]:
-        """Merge questions with their answers"""
+        """Merge questions with their answers (lists or iter_* generators)"""
         self._print_progress("Merging questions with answers...", "🔄")
 
         merged = []
-        questions_dict = {q["number"]: q for q in questions}
-        answers_dict = {a["number"]: a for a in answers}
+        questions_parsed = answers_parsed = 0
+        questions_dict = {}
+        for q in questions:
+            questions_dict[q["number"]] = q
+            questions_parsed += 1
+        answers_dict = {}
+        for a in answers:
+            answers_dict[a["number"]] = a
+            answers_parsed += 1
         all_numbers = set(questions_dict.keys()) | set(answers_dict.keys())
 
         unmatched_q = []
@@ -278,8 +309,8 @@ class QuestionAnswerProcessor:
                 unmatched_a.append(num)
 
         # Update stats
-        self.stats.questions_parsed = len(questions)
-        self.stats.answers_parsed = len(answers)
+        self.stats.questions_parsed = questions_parsed
+        self.stats.answers_parsed = answers_parsed
         self.stats.merged_count = len(merged)
         self.stats.unmatched_questions = unmatched_q
         self.stats.unmatched_answers = unmatched_a
@@ -368,33 +399,6 @@ class QuestionAnswerProcessor:
 
         self._print_success(f"Exported {len(data)} items to {filename.name}")
 
-    def export_to_sql(self, data: List[Dict]):
-        """Generate SQL INSERT statements"""
-        self._print_progress(f"Generating SQL statements...", "🗄️")
-
-        sql_count = 0
-        with open(self.sql_file, "w", encoding="utf-8") as f:
-            for item in data:
-                if item["category"] is None:
-                    continue
-
-                sql_count += 1
-
-                def escape_sql(text):
-                    if text is None:
-                        return ""
-                    return text.replace("'", "''")
-
-                sql = f"""INSERT OR IGNORE INTO {self.sql_table_name} (category_id, question_text, choice_a, choice_b, choice_c, choice_d, correct_answer, explanation, is_active, created_at, updated_at)
-VALUES ({item['category']}, '{escape_sql(item['question_text'])}', '{escape_sql(item['choice_a'])}', '{escape_sql(item['choice_b'])}', '{escape_sql(item['choice_c'])}', '{escape_sql(item['choice_d'])}', '{item['correct_answer']}', '{escape_sql(item['explanation'])}', TRUE, datetime('now'), datetime('now'));
-
-"""
-                f.write(sql)
-
-        self._print_success(
-            f"Generated {sql_count} SQL statements in {self.sql_file.name}"
-        )
-
     def step1_parse_and_merge(self):
         """Step 1: Parse questions and answers, then merge"""
         self._print_stage(ProcessingStage.PARSE, "📖")
@@ -408,27 +412,18 @@ VALUES ({item['category']}, '{escape_sql(item['question_text'])}', '{escape_sql(
             self._print_error(f"Answers file not found: {self.answers_file}")
             return False
 
-        self._print_progress(f"Reading {self.questions_file.name}...", "📄")
-        with open(self.questions_file, "r", encoding="utf-8") as f:
-            questions_text = f.read()
-
-        self._print_progress(f"Reading {self.answers_file.name}...", "📄")
-        with open(self.answers_file, "r", encoding="utf-8") as f:
-            answers_text = f.read()
-
-        # Parse
-        self._print_stage(ProcessingStage.PARSE, "🔍")
-        self._print_progress("Parsing questions...", "📝")
-        questions = self.parse_questions(questions_text)
-        self._print_success(f"Parsed {len(questions)} questions")
-
-        self._print_progress("Parsing answers...", "✍️")
-        answers = self.parse_answers(answers_text)
-        self._print_success(f"Parsed {len(answers)} answers")
-
-        # Merge
+        # Parse and merge in one streaming pass over both files
         self._print_stage(ProcessingStage.MERGE, "🔗")
-        self.merged_data, _, _ = self.merge_questions_answers(questions, answers)
+        self._print_progress(
+            f"Parsing {self.questions_file.name} and {self.answers_file.name}...",
+            "📝",
+        )
+        with open(self.questions_file, "r", encoding="utf-8") as qf, open(
+            self.answers_file, "r", encoding="utf-8"
+        ) as af:
+            self.merged_data, _, _ = self.merge_questions_answers(
+                self.iter_questions(qf), self.iter_answers(af)
+            )
 
         # Export for categorization
         self.export_to_json(self.merged_data, self.categorization_json)
@@ -511,7 +506,6 @@ VALUES ({item['category']}, '{escape_sql(item['question_text'])}', '{escape_sql(
         # Export
         self._print_stage(ProcessingStage.EXPORT, "💾")
         self.export_to_json(self.merged_data, self.final_json)
-        self.export_to_sql(self.merged_data)
 
         self._print_statistics()
 
@@ -549,7 +543,8 @@ VALUES ({item['category']}, '{escape_sql(item['question_text'])}', '{escape_sql(
             print(f"{'='*70}")
             print(f"📁 Output files in: {self.target_dir}")
             print(f"   📄 Final JSON: {self.final_json.name}")
-            print(f"   🗄️  SQL File: {self.sql_file.name}")
+            print(f"\n🗄️  Load it into the configured database (from backend/):")
+            print(f"   python manage.py import_questions {self.final_json}")
             print(f"{'='*70}\n")
 
         except KeyboardInterrupt:
@@ -563,7 +558,6 @@ if __name__ == "__main__":
     # Create processor
     processor = QuestionAnswerProcessor(
         naming_convention="Exam_1",
-        sql_table_name="api_question",
         auto_run=False,  # Set to True to skip prompts
     )
 
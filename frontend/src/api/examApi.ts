@@ -108,6 +108,14 @@ export const examApi = {
     });
   },
 
+  // Stop / restart the server-side exam clock
+  setPaused: async (sessionId: string, paused: boolean) => {
+    return apiFetch(`/exam-sessions/${sessionId}/pause/`, {
+      method: "POST",
+      body: JSON.stringify({ paused }),
+    });
+  },
+
   // Submit exam
   submitExam: async (sessionId: string, payload: ExamProgressPayload) => {
     return apiFetch(`/exam-sessions/${sessionId}/submit/`, {
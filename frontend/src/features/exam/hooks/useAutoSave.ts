@@ -1,4 +1,4 @@
-import { useEffect, useCallback } from "react";
+import { useEffect, useCallback, useRef } from "react";
 import { useExamStore } from "../stores/examStore";
 import { examApi } from "../../../api/examApi";
 
@@ -29,6 +29,17 @@ export function useAutoSave() {
     updateSnapshot,
   ]);
 
+  // ✅ Keep the server clock in step with pause/resume
+  const lastPaused = useRef(isPaused);
+  useEffect(() => {
+    if (!sessionId || lastPaused.current === isPaused) return;
+    lastPaused.current = isPaused;
+
+    examApi
+      .setPaused(sessionId, isPaused)
+      .catch((error) => console.error("[AutoSave] Pause sync failed:", error));
+  }, [isPaused, sessionId]);
+
   // ✅ Periodic backup every 30s
   useEffect(() => {
     const interval = setInterval(() => {